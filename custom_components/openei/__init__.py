@@ -1,29 +1,70 @@
 """Custom integration to integrate OpenEI with Home Assistant."""
 
+import hashlib
 import logging
-from datetime import timedelta
+from collections.abc import Mapping
+from dataclasses import replace
+from datetime import datetime, timedelta
+from time import monotonic
+from typing import Any
 
+import aiohttp
 import openeihttp
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import (
+    EventStateChangedData,
+    async_track_point_in_time,
+    async_track_point_in_utc_time,
+    async_track_state_change_event,
+    async_track_time_change,
+)
+from homeassistant.helpers.json import save_json
+from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
 from .const import (
-    BINARY_SENSORS,
     CONF_API_KEY,
     CONF_MANUAL_PLAN,
     CONF_PLAN,
+    CONF_REVISION_INTERVAL,
     CONF_SENSOR,
+    DEFAULT_REVISION_INTERVAL,
     DOMAIN,
+    OFF_PEAK_START,
+    OFF_PEAK_WINDOW,
     PLATFORMS,
-    SENSOR_TYPES,
+    SENSOR_ATTRIBUTES,
 )
+from .cost import CostAccumulator
+from .data import DATA_FIELDS, OpenEIData, OpenEIMetadata, OpenEIStats
+from .plan_store import PlanKey, async_get_plan_store
+from .profiler import RefreshProfiler
+from .quota import QuotaExceeded, async_get_quota
+from .schedule import RateSchedule
+from .services import async_setup_services
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
+# Data fields shown as attributes of another sensor
+ATTRIBUTE_SOURCES = {
+    field: key for key, attrs in SENSOR_ATTRIBUTES.items() for field in attrs.values()
+}
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+REFRESH_INTERVAL = timedelta(hours=1)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the OpenEI services."""
+    async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up this integration using UI."""
@@ -32,36 +73,227 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         raise ConfigEntryNotReady
 
     coordinator = OpenEIDataUpdateCoordinator(hass, config=entry)
-    await coordinator.async_config_entry_first_refresh()
+    await async_get_plan_store(hass).async_import(
+        coordinator.plan_key[1],
+        hass.config.path(".storage", f"openei_{entry.entry_id}"),
+    )
+    if await coordinator.async_load_snapshot():
+        # Entities start from the saved plan, the API is checked in the background
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} refresh {entry.title}"
+        )
+    else:
+        await coordinator.async_config_entry_first_refresh()
 
     entry.runtime_data = coordinator
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
 
-class OpenEIDataUpdateCoordinator(DataUpdateCoordinator):
+class OpenEIDataUpdateCoordinator(DataUpdateCoordinator[OpenEIData | None]):
     """Class to manage fetching data from the API."""
 
     def __init__(self, hass: HomeAssistant, config: ConfigEntry) -> None:
         """Initialize."""
         self._config = config
+        self._offset = entry_offset(config.entry_id)
+        self._schedule: RateSchedule | None = None
+        self._metadata_schedule: RateSchedule | None = None
+        self.metadata = OpenEIMetadataCoordinator(hass, config)
+        self.stats = OpenEIStatsCoordinator(hass, config)
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._rate_limit_events = 0
+        self._consecutive_failures = 0
+        self._revision_check_failed = False
+        self._transform_time: float | None = None
+        self._next_refresh: datetime | None = None
+        self._fetching = False
+        self._notified: OpenEIData | None = None
+        self._notified_success: bool | None = None
+        self.skipped_writes = 0
+        self._profiler: RefreshProfiler | None = None
+        self._unsub_profile: CALLBACK_TYPE | None = None
+        self._unsub_profile_deadline: CALLBACK_TYPE | None = None
+        self._unsub_boundary: CALLBACK_TYPE | None = None
+        self._unsub_expiry: CALLBACK_TYPE | None = None
+        self._unsub_meter: CALLBACK_TYPE | None = None
+        self._unsub_midnight: CALLBACK_TYPE | None = None
+        self.cost: CostAccumulator | None = None
+        self._cost_restored = False
+        self._meter = config.data.get(CONF_SENSOR)
+        if meter := self._meter:
+            self.cost = CostAccumulator()
+            self._unsub_meter = async_track_state_change_event(
+                hass, meter, self._async_handle_meter
+            )
+            self._unsub_midnight = async_track_time_change(
+                hass, self._async_handle_midnight, hour=0, minute=0, second=0
+            )
+        self._store = async_get_plan_store(hass)
+        self._subscribed_key = self.plan_key
+        self._unsub_plan: CALLBACK_TYPE | None = self._store.async_subscribe(
+            self._subscribed_key, self._async_plan_updated
+        )
 
         super().__init__(
             hass,
             _LOGGER,
             config_entry=config,
             name=DOMAIN,
-            update_interval=timedelta(hours=1),
+            update_interval=REFRESH_INTERVAL,
+        )
+
+    @property
+    def schedule(self) -> RateSchedule | None:
+        """Return the compiled rate plan."""
+        return self._schedule
+
+    @property
+    def plan_key(self) -> PlanKey:
+        """Return the (API key, plan label) pair this entry uses."""
+        return get_plan_key(self._config.data)
+
+    async def async_prefetch(self, data: dict[str, Any]) -> None:
+        """Fetch the plan a new configuration uses before it is applied."""
+        await self._store.async_fetch(get_plan_key(data))
+
+    @callback
+    def async_apply_config(self) -> None:
+        """Switch the live coordinator to the entry's current plan and meter.
+
+        The plan must have been prefetched, all entities are updated in one
+        pass so there is no unavailable window.
+        """
+        key = self.plan_key
+        if key != self._subscribed_key:
+            # Subscribe first so a shared plan is not dropped in between
+            unsub_old = self._unsub_plan
+            self._unsub_plan = self._store.async_subscribe(
+                key, self._async_plan_updated
+            )
+            self._subscribed_key = key
+            if unsub_old is not None:
+                unsub_old()
+
+        meter = self._config.data.get(CONF_SENSOR)
+        if meter != self._meter:
+            self._meter = meter
+            if self._unsub_meter is not None:
+                self._unsub_meter()
+                self._unsub_meter = None
+            if meter:
+                self._unsub_meter = async_track_state_change_event(
+                    self.hass, meter, self._async_handle_meter
+                )
+            if self.cost is not None:
+                # Usage is measured from the new meter's next reading
+                self.cost.last_reading = None
+
+        if (schedule := self._store.async_get(key)) is None:
+            return
+        _LOGGER.debug("Switching to plan %s", key[1])
+        self._schedule = schedule
+        self._async_apply_metadata(schedule)
+        self.async_set_updated_data(self._build_data(schedule, self._get_reading()))
+        self._async_refresh_finished()
+
+    async def async_load_snapshot(self) -> bool:
+        """Start from the persisted copy of the plan if there is one."""
+        if (schedule := await self._store.async_restore(self.plan_key)) is None:
+            return False
+
+        self._schedule = schedule
+        self._async_apply_metadata(schedule)
+        _LOGGER.debug("Loaded stored copy of plan %s", self.plan_key[1])
+        self.async_set_updated_data(self._build_data(schedule, self._get_reading()))
+        return True
+
+    @property
+    def profiling(self) -> bool:
+        """Return if refreshes are being profiled."""
+        return self._profiler is not None
+
+    @callback
+    def async_start_profile(
+        self, path: str, refreshes: int | None, duration: timedelta | None
+    ) -> None:
+        """Profile the next refreshes, or those within a time window."""
+        deadline = dt_util.utcnow() + duration if duration is not None else None
+        self._profiler = RefreshProfiler(path, refreshes, deadline)
+        self._unsub_profile = self._store.async_profile(self.plan_key)
+        if deadline is not None:
+            self._unsub_profile_deadline = async_track_point_in_utc_time(
+                self.hass, self._async_handle_profile_deadline, deadline
+            )
+        _LOGGER.info("Profiling refreshes of %s", self._config.title)
+
+    async def _async_handle_profile_deadline(self, _now: datetime) -> None:
+        """Stop profiling when the profiled time window is over."""
+        self._unsub_profile_deadline = None
+        await self.async_stop_profile()
+
+    async def async_stop_profile(self) -> None:
+        """Stop profiling and write the refreshes profiled so far."""
+        if (profiler := self._profiler) is None:
+            return
+
+        self._profiler = None
+        if self._unsub_profile is not None:
+            self._unsub_profile()
+            self._unsub_profile = None
+        if self._unsub_profile_deadline is not None:
+            self._unsub_profile_deadline()
+            self._unsub_profile_deadline = None
+        await self.hass.async_add_executor_job(
+            save_json, profiler.path, profiler.as_dict()
         )
+        _LOGGER.info(
+            "Wrote profile of %s refreshes of %s to %s",
+            len(profiler.samples),
+            self._config.title,
+            profiler.path,
+        )
+
+    async def _async_refresh(
+        self,
+        log_failures: bool = True,
+        raise_on_auth_failed: bool = False,
+        scheduled: bool = False,
+        raise_on_entry_error: bool = False,
+    ) -> None:
+        """Refresh data, timing the refresh while it is being profiled."""
+        if (profiler := self._profiler) is None:
+            await super()._async_refresh(
+                log_failures, raise_on_auth_failed, scheduled, raise_on_entry_error
+            )
+            return
 
-    async def _async_update_data(self) -> dict:
+        profiler.start()
+        try:
+            await super()._async_refresh(
+                log_failures, raise_on_auth_failed, scheduled, raise_on_entry_error
+            )
+        finally:
+            # Profiling may have been stopped while the refresh ran
+            if profiler.finish() and profiler is self._profiler:
+                await self.async_stop_profile()
+
+    async def _async_update_data(self) -> OpenEIData | None:
         """Update data via library."""
+        # Counted as failed until the plan has been evaluated
+        self._consecutive_failures += 1
         try:
-            return await self._get_sensors()
+            data = await self._get_sensors()
+        except QuotaExceeded as exception:
+            self._rate_limit_events += 1
+            _LOGGER.warning("Skipping OpenEI request: %s", exception)
+            return self.data
         except openeihttp.RateLimit:
+            self._rate_limit_events += 1
             _LOGGER.error("API Rate limit exceeded, retrying later.")
-            # Return previously cached data if available, else empty dict
-            return self.data or {}
+            # Return previously cached data if available
+            return self.data
         except openeihttp.NotAuthorized:
             _LOGGER.error("Invalid OpenEI API key.")
             raise UpdateFailed("Invalid API key") from None
@@ -70,23 +302,352 @@ class OpenEIDataUpdateCoordinator(DataUpdateCoordinator):
             raise UpdateFailed(f"OpenEI API error: {exception}") from exception
         except AssertionError as exception:
             _LOGGER.debug("Data not yet available: %s", exception)
-            return self.data or {}
+            return self.data
         except Exception as exception:
             _LOGGER.debug("Unexpected exception: %s", exception)
             raise UpdateFailed(f"Unexpected error: {exception}") from exception
+        if not self._revision_check_failed:
+            self._consecutive_failures = 0
+        return data
 
-    async def _get_sensors(self) -> dict:
-        """Fetch and return sensor data from the API."""
-        api = self._config.data.get(CONF_API_KEY)
-        plan = self._config.data.get(CONF_PLAN)
-        meter = self._config.data.get(CONF_SENSOR)
-        cache_file = (
-            f"{self.hass.config.config_dir}/.storage/openei_{self._config.entry_id}"
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next refresh at this entry's offset within the hour."""
+        now = dt_util.utcnow()
+        period = REFRESH_INTERVAL.total_seconds()
+        delay = (self._offset - now.timestamp()) % period
+        if delay < 60:
+            delay += period
+        self.update_interval = timedelta(seconds=delay)
+        self._next_refresh = now + self.update_interval
+        super()._schedule_refresh()
+
+    @callback
+    def _async_refresh_finished(self) -> None:
+        """Re-arm the boundary and plan expiry timers after every refresh."""
+        self._async_schedule_boundary()
+        self._async_schedule_expiry()
+        self._async_update_stats()
+
+    @callback
+    def _async_update_stats(self) -> None:
+        """Push the refresh timings and counters to the diagnostics tier."""
+        fetch = self._store.async_fetch_stats(self.plan_key)
+        self.stats.async_set_updated_data(
+            OpenEIStats(
+                fetch_latency=fetch.latency if fetch else None,
+                response_bytes=fetch.response_bytes if fetch else None,
+                compile_time=fetch.compile_time if fetch else None,
+                transform_time=self._transform_time,
+                cache_hits=self._cache_hits,
+                cache_misses=self._cache_misses,
+                rate_limit_events=self._rate_limit_events,
+                consecutive_failures=self._consecutive_failures,
+                next_refresh=self._next_refresh,
+            )
         )
-        reading: float = 0.0
 
-        if self._config.data.get(CONF_MANUAL_PLAN):
-            plan = self._config.data.get(CONF_MANUAL_PLAN)
+    @callback
+    def _async_schedule_boundary(self) -> None:
+        """Arm a single timer for the next rate structure change."""
+        if self._unsub_boundary is not None:
+            self._unsub_boundary()
+            self._unsub_boundary = None
+
+        if not self.data or self._schedule is None:
+            return
+
+        next_time = self.data.next_energy_rate_structure_time
+        if next_time is None:
+            return
+
+        _LOGGER.debug("Next rate structure change at %s", next_time)
+        self._unsub_boundary = async_track_point_in_time(
+            self.hass, self._async_handle_boundary, next_time
+        )
+
+    @callback
+    def _async_handle_boundary(self, now: datetime) -> None:
+        """Push new states when the rate structure changes."""
+        self._unsub_boundary = None
+        if self._schedule is None:
+            return
+
+        # Charge the energy used so far at the rate that is ending
+        if self.data and (reading := self._read_meter()) is not None:
+            self._async_accumulate(now - timedelta(microseconds=1), reading)
+        self.data = self._build_data(self._schedule, self._get_reading())
+        self.async_update_listeners()
+        self._async_schedule_boundary()
+
+    @callback
+    def _async_handle_meter(self, event: Event[EventStateChangedData]) -> None:
+        """Re-evaluate tiers locally when the meter reports a new reading."""
+        schedule = self._schedule
+        data = self.data
+        new_state = event.data["new_state"]
+        if schedule is None or not data or new_state is None:
+            return
+
+        try:
+            reading = float(new_state.state)
+        except ValueError:
+            return
+
+        now = dt_util.now()
+        cost_changed = self._async_accumulate(now, reading)
+        rate = schedule.rate(now, reading)
+        adjustment = schedule.adjustment(now, reading)
+        tier_rate = schedule.tier_rate(now, reading)
+        if (
+            not cost_changed
+            and rate == data.current_rate
+            and adjustment == data.current_adjustment
+            and tier_rate == data.monthly_tier_rate
+        ):
+            return
+
+        self.data = replace(
+            self.data,
+            current_rate=rate,
+            current_adjustment=adjustment,
+            monthly_tier_rate=tier_rate,
+        )
+        self.async_update_listeners()
+
+    @callback
+    def _async_accumulate(self, now: datetime, reading: float) -> bool:
+        """Charge a meter reading at the effective rate it was used at."""
+        data = self.data
+        if self.cost is None or not data:
+            return False
+
+        price = data.current_rate
+        if price is not None:
+            price += data.current_adjustment or 0.0
+        if not self.cost.add(now, reading, price):
+            return False
+        self.data = self._update_cost(data, now)
+        return True
+
+    def _update_cost(self, data: OpenEIData, now: datetime) -> OpenEIData:
+        """Return the sensor data with the accumulated cost totals."""
+        if self.cost is None or self._schedule is None:
+            return data
+        return replace(
+            data,
+            energy_cost_today=self.cost.today,
+            bill_to_date=self.cost.bill(
+                now, self._schedule.fixedchargefirstmeter, self._schedule.mincharge
+            ),
+        )
+
+    @callback
+    def _async_handle_midnight(self, now: datetime) -> None:
+        """Close the day and billing cycle totals at midnight."""
+        if self.cost is None or not self.data:
+            return
+
+        if (reading := self._read_meter()) is not None:
+            self._async_accumulate(now - timedelta(microseconds=1), reading)
+        self.cost.roll(now)
+        self.data = self._update_cost(self.data, now)
+        self.async_update_listeners()
+
+    @callback
+    def async_restore_cost(self, state: dict) -> None:
+        """Restore the cost totals saved before the last restart."""
+        if self.cost is None or self._cost_restored:
+            return
+
+        self._cost_restored = True
+        self.cost.restore(state)
+        if self.data:
+            now = dt_util.now()
+            self.cost.roll(now)
+            self.data = self._update_cost(self.data, now)
+            self.async_update_listeners()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify only entities whose value, unit or attributes changed."""
+        data = self.data
+        previous = self._notified
+        changed: set[str] | None = None
+        if self.last_update_success == self._notified_success:
+            changed = set()
+            if data is not previous:
+                # Snapshots are immutable, the last notified one can be compared
+                for field in DATA_FIELDS:
+                    if getattr(data, field, None) != getattr(previous, field, None):
+                        changed.add(ATTRIBUTE_SOURCES.get(field, field))
+
+        self._notified = data
+        self._notified_success = self.last_update_success
+
+        profiler = self._profiler
+        if profiler is not None and profiler.active:
+            start = monotonic()
+        for update_callback, context in list(self._listeners.values()):
+            if changed is None or context is None or context in changed:
+                update_callback()
+            else:
+                self.skipped_writes += 1
+        if profiler is not None and profiler.active:
+            profiler.add("fan_out", (monotonic() - start) * 1000)
+
+    @callback
+    def _async_schedule_expiry(self) -> None:
+        """Arm a timer to fetch the plan again when it stops being effective."""
+        if self._unsub_expiry is not None:
+            self._unsub_expiry()
+            self._unsub_expiry = None
+
+        if self._schedule is None:
+            return
+
+        enddate = self._schedule.enddate
+        if enddate is None or enddate <= dt_util.utcnow():
+            return
+
+        self._unsub_expiry = async_track_point_in_utc_time(
+            self.hass, self._async_handle_expiry, enddate
+        )
+
+    async def _async_handle_expiry(self, _now: datetime) -> None:
+        """Refresh as soon as the plan expires."""
+        self._unsub_expiry = None
+        await self.async_request_refresh()
+
+    def _plan_refresh_due(self) -> bool:
+        """Return if the plan may have a new revision and should be fetched."""
+        fetched = self._store.async_last_fetch(self.plan_key)
+        if fetched is None or self._schedule is None:
+            return True
+
+        now = dt_util.utcnow()
+        interval = timedelta(
+            hours=self._config.options.get(
+                CONF_REVISION_INTERVAL, DEFAULT_REVISION_INTERVAL
+            )
+        )
+        enddate = self._schedule.enddate
+        if enddate is not None and fetched < enddate <= now:
+            return True
+
+        due = fetched + interval
+        if interval >= timedelta(days=1):
+            # Not urgent, wait for this entry's off-peak slot. A check made at a
+            # slot is due again at the same slot, not the one a day after it.
+            due = self._next_off_peak(due - OFF_PEAK_WINDOW)
+        return now >= due
+
+    def _next_off_peak(self, after: datetime) -> datetime:
+        """Return this entry's first off-peak revision check slot after a time."""
+        local = dt_util.as_local(after)
+        slot = datetime.combine(local.date(), OFF_PEAK_START, local.tzinfo) + timedelta(
+            seconds=self._offset % OFF_PEAK_WINDOW.total_seconds()
+        )
+        if slot < local:
+            slot += timedelta(days=1)
+        return slot
+
+    @callback
+    def _async_plan_updated(self, schedule: RateSchedule) -> None:
+        """Apply a plan fetched by any coordinator sharing this plan."""
+        self._schedule = schedule
+        self._async_apply_metadata(schedule)
+        if self._fetching or not self.data:
+            return
+
+        self.data = self._build_data(schedule, self._get_reading())
+        self.async_update_listeners()
+        self._async_schedule_boundary()
+
+    async def async_shutdown(self) -> None:
+        """Cancel timers, leave the plan store and shut down the coordinator."""
+        if self._unsub_boundary is not None:
+            self._unsub_boundary()
+            self._unsub_boundary = None
+        if self._unsub_expiry is not None:
+            self._unsub_expiry()
+            self._unsub_expiry = None
+        if self._unsub_meter is not None:
+            self._unsub_meter()
+            self._unsub_meter = None
+        if self._unsub_midnight is not None:
+            self._unsub_midnight()
+            self._unsub_midnight = None
+        if self._unsub_plan is not None:
+            self._unsub_plan()
+            self._unsub_plan = None
+        await self.async_stop_profile()
+        await self.metadata.async_shutdown()
+        await self.stats.async_shutdown()
+        await super().async_shutdown()
+
+    async def _get_sensors(self) -> OpenEIData:
+        """Return sensor data, fetching the plan only when it may have changed."""
+        fetch = self._store.async_fetch_stats(self.plan_key)
+        self._revision_check_failed = False
+        if self._schedule is None:
+            self._schedule = await self._get_schedule()
+        elif self._plan_refresh_due():
+            _LOGGER.debug("Checking for a new revision of plan: %s", self.plan_key[1])
+            try:
+                self._schedule = await self._get_schedule(force=True)
+            except (
+                openeihttp.APIError,
+                openeihttp.NotAuthorized,
+                openeihttp.UrlNotFound,
+                aiohttp.ClientError,
+                AssertionError,
+            ) as exception:
+                # The held plan still prices every hour, keep the sensors available
+                _LOGGER.warning(
+                    "Checking plan %s for a new revision failed, using the held "
+                    "revision: %s",
+                    self.plan_key[1],
+                    exception,
+                )
+                self._revision_check_failed = True
+
+        # Every download leaves new fetch stats behind
+        fetched = self._store.async_fetch_stats(self.plan_key)
+        if fetched is fetch:
+            self._cache_hits += 1
+        else:
+            self._cache_misses += 1
+
+        self._async_apply_metadata(self._schedule)
+        start = monotonic()
+        data = self._build_data(self._schedule, self._get_reading())
+        self._transform_time = (monotonic() - start) * 1000
+
+        if (profiler := self._profiler) is not None:
+            if fetched is not fetch and fetched is not None:
+                decode_time = fetched.decode_time or 0.0
+                profiler.add("network", fetched.latency - decode_time)
+                profiler.add("json_decode", decode_time)
+                profiler.add("processing", fetched.compile_time)
+            profiler.add("processing", self._transform_time)
+        return data
+
+    async def _get_schedule(self, force: bool = False) -> RateSchedule:
+        """Return the compiled plan from the shared store, fetching it if needed."""
+        if not force and (schedule := self._store.async_get(self.plan_key)):
+            return schedule
+
+        self._fetching = True
+        try:
+            return await self._store.async_fetch(self.plan_key, force)
+        finally:
+            self._fetching = False
+
+    def _get_reading(self) -> float:
+        """Return the current meter reading, or 0.0 if unavailable."""
+        meter = self._config.data.get(CONF_SENSOR)
+        reading: float = 0.0
 
         if meter:
             _LOGGER.debug("Using meter data from sensor: %s", meter)
@@ -109,43 +670,128 @@ class OpenEIDataUpdateCoordinator(DataUpdateCoordinator):
                         state_obj.state,
                     )
 
-        rate = openeihttp.Rates(
-            api=api,
-            plan=plan,
-            reading=reading,
-            cache_file=cache_file,
-            session=async_get_clientsession(self.hass),
-        )
-        await rate.update()
-
-        data = {}
-
-        for sensor in SENSOR_TYPES:  # pylint: disable=consider-using-dict-items
-            _sensor: dict = {}
-            if sensor == "all_rates":
-                value = rate.all_rates
-                if value is not None:
-                    _sensor["all_rates"] = value[0]
-                    _sensor["all_adjustments"] = value[1]
-                else:
-                    _sensor["all_rates"] = None
-                    _sensor["all_adjustments"] = None
-            else:
-                value = getattr(rate, SENSOR_TYPES[sensor].key)
-                if isinstance(value, tuple):
-                    _sensor[sensor] = value[0]
-                    _sensor[f"{sensor}_uom"] = value[1]
-                else:
-                    _sensor[sensor] = value
-            data.update(_sensor)
+        return reading
+
+    def _read_meter(self) -> float | None:
+        """Return the current meter reading, or None if there is none."""
+        meter = self._config.data.get(CONF_SENSOR)
+        if not meter or (state_obj := self.hass.states.get(meter)) is None:
+            return None
+        try:
+            return float(state_obj.state)
+        except ValueError:
+            return None
+
+    def _build_data(self, schedule: RateSchedule, reading: float) -> OpenEIData:
+        """Evaluate the compiled schedule at the current time."""
+        now = dt_util.now()
+        next_time, next_structure = schedule.next_change(now)
+        all_rates = schedule.all_rates
+        quota = async_get_quota(self.hass, self.plan_key[0])
+
+        data = OpenEIData(
+            current_rate=schedule.rate(now, reading),
+            current_adjustment=schedule.adjustment(now, reading),
+            current_energy_rate_structure=schedule.period(now),
+            next_energy_rate_structure=next_structure,
+            next_energy_rate_structure_time=next_time,
+            all_rates=all_rates[0] if all_rates is not None else None,
+            all_adjustments=all_rates[1] if all_rates is not None else None,
+            monthly_tier_rate=schedule.tier_rate(now, reading),
+            current_sell_rate=schedule.sell_rate(now),
+            api_budget=quota.remaining,
+            api_backoff_until=quota.backoff_until,
+        )
 
-        for sensor in BINARY_SENSORS:  # pylint: disable=consider-using-dict-items
-            data[sensor] = getattr(rate, sensor)
+        if self.cost is not None:
+            if self.cost.last_reading is None:
+                # Seed the baseline the first meter change is measured from
+                self.cost.add(now, self._read_meter(), None)
+            self.cost.roll(now)
+            data = self._update_cost(data, now)
 
         _LOGGER.debug("DEBUG: %s", data)
         return data
 
+    @callback
+    def _async_apply_metadata(self, schedule: RateSchedule) -> None:
+        """Push plan metadata to the metadata tier when the plan changes."""
+        if schedule is self._metadata_schedule:
+            return
+
+        self._metadata_schedule = schedule
+        mincharge = schedule.mincharge or (None, None)
+        fixedcharge = schedule.fixedchargefirstmeter or (None, None)
+        self.metadata.async_set_updated_data(
+            OpenEIMetadata(
+                rate_name=schedule.rate_name,
+                approval=schedule.approval,
+                distributed_generation=schedule.distributed_generation,
+                mincharge=mincharge[0],
+                mincharge_uom=mincharge[1],
+                fixedchargefirstmeter=fixedcharge[0],
+                fixedchargefirstmeter_uom=fixedcharge[1],
+            )
+        )
+
+
+class OpenEIMetadataCoordinator(DataUpdateCoordinator[OpenEIMetadata | None]):
+    """Hold plan metadata, updated only when a new plan revision is applied."""
+
+    def __init__(self, hass: HomeAssistant, config: ConfigEntry) -> None:
+        """Initialize."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=config,
+            name=f"{DOMAIN} metadata",
+        )
+        self.data: OpenEIMetadata | None = None
+
+    async def _async_update_data(self) -> OpenEIMetadata | None:
+        """Return the held metadata, it only changes with a new plan revision."""
+        return self.data
+
+
+class OpenEIStatsCoordinator(DataUpdateCoordinator[OpenEIStats | None]):
+    """Hold refresh timings and counters, pushed after every refresh."""
+
+    def __init__(self, hass: HomeAssistant, config: ConfigEntry) -> None:
+        """Initialize."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=config,
+            name=f"{DOMAIN} stats",
+        )
+        self.data: OpenEIStats | None = None
+
+    async def _async_update_data(self) -> OpenEIStats | None:
+        """Return the held stats, they are pushed by the main coordinator."""
+        return self.data
+
+
+def get_plan_key(data: Mapping[str, Any]) -> PlanKey:
+    """Return the (API key, plan label) pair an entry's data selects."""
+    plan = data.get(CONF_MANUAL_PLAN) or data.get(CONF_PLAN)
+    return data.get(CONF_API_KEY), plan
+
+
+def entry_offset(entry_id: str) -> int:
+    """Return a stable offset in seconds within a day for an entry."""
+    digest = hashlib.sha256(entry_id.encode()).digest()
+    return int.from_bytes(digest[:8]) % 86400
+
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Handle removal of an entry."""
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the stored plan once no entry uses it."""
+    plan = get_plan_key(entry.data)[1]
+    for other in hass.config_entries.async_entries(DOMAIN):
+        if other.entry_id != entry.entry_id and get_plan_key(other.data)[1] == plan:
+            return
+    await async_get_plan_store(hass).async_remove(plan)
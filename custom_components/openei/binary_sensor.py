@@ -1,5 +1,7 @@
 """Binary sensor platform for OpenEI."""
 
+from operator import attrgetter
+
 from homeassistant.components.binary_sensor import (
     BinarySensorEntity,
     BinarySensorEntityDescription,
@@ -15,7 +17,8 @@ from .const import BINARY_SENSORS, DOMAIN
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_devices):
     """Set up binary_sensor platform."""
-    coordinator = entry.runtime_data
+    # Binary sensors only show plan metadata
+    coordinator = entry.runtime_data.metadata
 
     binary_sensors = []
     for sensor_description in BINARY_SENSORS.values():
@@ -36,38 +39,32 @@ class OpenEIBinarySensor(CoordinatorEntity, BinarySensorEntity):
         coordinator,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, sensor_description.key)
         self._name = sensor_description.name
         self._key = sensor_description.key
         self._unique_id = entry.entry_id
-        self._icon = sensor_description.icon
         self._config = entry
         self.coordinator = coordinator
 
+        self._value = attrgetter(self._key)
+        self._attr_icon = sensor_description.icon
+        self._attr_device_info = DeviceInfo(
+            entry_type=DeviceEntryType.SERVICE,
+            identifiers={(DOMAIN, self._config.entry_id)},
+            manufacturer="OpenEI",
+            name="OpenEI",
+        )
         self._attr_name = f"{slugify(self._config.title)}_{self._name}"
         self._attr_unique_id = f"{self._key}_{self._unique_id}"
 
     @property
     def is_on(self) -> bool | None:
         """Return true if the binary sensor is on."""
-        return self.coordinator.data.get(self._key)
+        if (data := self.coordinator.data) is None:
+            return None
+        return self._value(data)
 
     @property
     def available(self) -> bool:
         """Return if entity is available."""
         return self.coordinator.last_update_success
-
-    @property
-    def icon(self) -> str:
-        """Return the icon."""
-        return self._icon
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return device registry information."""
-        return DeviceInfo(
-            entry_type=DeviceEntryType.SERVICE,
-            identifiers={(DOMAIN, self._config.entry_id)},
-            manufacturer="OpenEI",
-            name="OpenEI",
-        )
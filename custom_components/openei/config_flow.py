@@ -2,16 +2,18 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from time import monotonic, time
 from typing import Any
 
 import openeihttp
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.components.sensor import DOMAIN as SENSORS_DOMAIN
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers import entity_registry as er
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util.hass_dict import HassKey
 
 from .const import (
     CONF_API_KEY,
@@ -19,13 +21,29 @@ from .const import (
     CONF_MANUAL_PLAN,
     CONF_PLAN,
     CONF_RADIUS,
+    CONF_REVISION_INTERVAL,
     CONF_SENSOR,
     CONF_UTILITY,
+    DEFAULT_REVISION_INTERVAL,
     DOMAIN,
+    LOOKUP_CACHE_TTL,
+    LOOKUP_MAX_PLANS,
+    LOOKUP_PAGE_SIZE,
+    LOOKUP_SECTOR,
 )
+from .entity_index import async_get_entity_index
+from .quota import ApiQuota, QuotaExceeded, async_get_quota
 
 _LOGGER = logging.getLogger(__name__)
 
+type LookupKey = tuple[str, str | None, float | None, float | None, int]
+
+NOT_LISTED = "Not Listed"
+
+DATA_LOOKUP_CACHE: HassKey[dict[LookupKey, tuple[float, dict]]] = HassKey(
+    f"{DOMAIN}_lookup_cache"
+)
+
 
 class OpenEIFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
     """Config flow for OpenEI."""
@@ -37,6 +55,8 @@ class OpenEIFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         self._data = {}
         self._errors = {}
         self._entry = {}
+        self._lookup_key: LookupKey | None = None
+        self._lookup: asyncio.Task[dict] | None = None
 
     async def async_step_user(self, user_input=None):
         """Handle a flow initialized by the user."""
@@ -44,6 +64,7 @@ class OpenEIFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
         if user_input is not None:
             self._data.update(user_input)
+            self._async_start_lookup()
             return await self.async_step_user_2()
 
         return await self._show_config_form(user_input)
@@ -72,11 +93,11 @@ class OpenEIFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
         return await self._show_config_form_3(user_input)
 
-    # @staticmethod
-    # @callback
-    # def async_get_options_flow(config_entry):
-    #     """Enable option flow."""
-    #     return OpenEIOptionsFlowHandler(config_entry)
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Enable option flow."""
+        return OpenEIOptionsFlowHandler()
 
     async def _show_config_form(self, user_input):  # pylint: disable=unused-argument
         """Show the configuration form to edit location data."""
@@ -93,7 +114,9 @@ class OpenEIFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
     async def _show_config_form_2(self, user_input):  # pylint: disable=unused-argument
         """Show the configuration form to edit location data."""
         defaults = {}
-        utility_list = await _get_utility_list(self.hass, self._data)
+        if (plans := await self._async_get_plans()) is None:
+            return await self._show_config_form(self._data)
+        utility_list = _get_utility_list(plans)
         return self.async_show_form(
             step_id="user_2",
             data_schema=_get_schema_step_2(self._data, defaults, utility_list),
@@ -103,13 +126,75 @@ class OpenEIFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
     async def _show_config_form_3(self, user_input):  # pylint: disable=unused-argument
         """Show the configuration form to edit location data."""
         defaults = {}
-        plan_list = await _get_plan_list(self.hass, self._data)
+        if (plans := await self._async_get_plans()) is None:
+            return await self._show_config_form(self._data)
+        plan_list = _get_plan_list(plans, self._data)
         return self.async_show_form(
             step_id="user_3",
             data_schema=_get_schema_step_3(self.hass, self._data, defaults, plan_list),
             errors=self._errors,
         )
 
+    @callback
+    def _async_start_lookup(self) -> None:
+        """Start looking up utilities and plans before they are needed.
+
+        A lookup still running for different inputs is cancelled. A lookup for
+        the same inputs is reused unless it failed or was cancelled.
+        """
+        key = _get_lookup_key(self.hass, self._data)
+        if (
+            key == self._lookup_key
+            and (lookup := self._lookup) is not None
+            and (
+                not lookup.done()
+                or (not lookup.cancelled() and lookup.exception() is None)
+            )
+        ):
+            return
+
+        if self._lookup is not None and not self._lookup.done():
+            self._lookup.cancel()
+        self._lookup_key = key
+        self._lookup = self.hass.async_create_task(
+            _get_plans(self.hass, key), f"{DOMAIN} plan lookup"
+        )
+        # Failures are raised to whichever step awaits the lookup
+        self._lookup.add_done_callback(
+            lambda task: task.cancelled() or task.exception()
+        )
+
+    async def _async_get_plans(self) -> dict | None:
+        """Return the utility/plan map, looking it up once per location.
+
+        If the lookup fails a form error is set and None is returned, it is
+        retried when the location is submitted again.
+        """
+        if self._lookup is None:
+            self._async_start_lookup()
+        assert self._lookup is not None
+        try:
+            return await self._lookup
+        except QuotaExceeded as err:
+            _LOGGER.warning("Skipping plan lookup: %s", err)
+            self._errors["base"] = "quota_exceeded"
+        except openeihttp.RateLimit:
+            _LOGGER.warning("API rate limit exceeded during plan lookup.")
+            self._errors["base"] = "rate_limited"
+        except openeihttp.NotAuthorized:
+            _LOGGER.debug("Invalid API key for plan lookup.")
+            self._errors["base"] = "invalid_auth"
+        except (openeihttp.APIError, openeihttp.UrlNotFound) as err:
+            _LOGGER.debug("Plan lookup failed: %s", err)
+            self._errors["base"] = "lookup_failed"
+        return None
+
+    @callback
+    def async_remove(self) -> None:
+        """Cancel a lookup that is no longer needed."""
+        if self._lookup is not None and not self._lookup.done():
+            self._lookup.cancel()
+
     async def async_step_reconfigure(self, user_input: dict[str, Any] | None = None):
         """Add reconfigure step to allow to reconfigure a config entry."""
         self._entry = self.hass.config_entries.async_get_entry(self.context["entry_id"])
@@ -119,7 +204,11 @@ class OpenEIFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
         if user_input is not None:
             self._data.update(user_input)
+            self._async_start_lookup()
             return await self.async_step_reconfig_2()
+
+        # The current location is the likely answer, look it up while editing
+        self._async_start_lookup()
         return await self._show_reconfig_form(user_input)
 
     async def _show_reconfig_form(self, user_input):
@@ -145,7 +234,9 @@ class OpenEIFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
     async def _show_reconfig_2(self):
         """Show the configuration form to edit configuration data."""
         defaults = {}
-        utility_list = await _get_utility_list(self.hass, self._data)
+        if (plans := await self._async_get_plans()) is None:
+            return await self._show_reconfig_form(self._data)
+        utility_list = _get_utility_list(plans)
         _LOGGER.debug("Utility list: %s", utility_list)
         return self.async_show_form(
             step_id="reconfig_2",
@@ -161,16 +252,43 @@ class OpenEIFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             if user_input[CONF_SENSOR] == "(none)":
                 user_input.pop(CONF_SENSOR, None)
             self._data.update(user_input)
+            if not _can_apply_in_place(self._entry, self._data):
+                self.hass.config_entries.async_update_entry(
+                    self._entry, data=self._data
+                )
+                await self.hass.config_entries.async_reload(self._entry.entry_id)
+                _LOGGER.debug("%s reconfigured.", DOMAIN)
+                return self.async_abort(reason="reconfigure_successful")
+
+            coordinator = self._entry.runtime_data
+            try:
+                await coordinator.async_prefetch(self._data)
+            except openeihttp.NotAuthorized:
+                _LOGGER.debug("Invalid API key for the new plan.")
+                self._errors["base"] = "invalid_auth"
+                return await self._show_reconfig_3()
+            except (
+                openeihttp.RateLimit,
+                openeihttp.APIError,
+                openeihttp.UrlNotFound,
+                AssertionError,
+            ) as err:
+                _LOGGER.debug("Unable to fetch the new plan: %s", err)
+                self._errors["base"] = "cannot_connect"
+                return await self._show_reconfig_3()
+
             self.hass.config_entries.async_update_entry(self._entry, data=self._data)
-            await self.hass.config_entries.async_reload(self._entry.entry_id)
-            _LOGGER.debug("%s reconfigured.", DOMAIN)
+            coordinator.async_apply_config()
+            _LOGGER.debug("%s reconfigured in place.", DOMAIN)
             return self.async_abort(reason="reconfigure_successful")
         return await self._show_reconfig_3()
 
     async def _show_reconfig_3(self):
         """Show the configuration form to edit configuration data."""
         defaults = {}
-        plan_list = await _get_plan_list(self.hass, self._data)
+        if (plans := await self._async_get_plans()) is None:
+            return await self._show_reconfig_form(self._data)
+        plan_list = _get_plan_list(plans, self._data)
         return self.async_show_form(
             step_id="reconfig_3",
             data_schema=_get_schema_step_3(self.hass, self._data, defaults, plan_list),
@@ -178,6 +296,29 @@ class OpenEIFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
 
+class OpenEIOptionsFlowHandler(config_entries.OptionsFlow):
+    """Options flow for OpenEI."""
+
+    async def async_step_init(self, user_input=None):
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_REVISION_INTERVAL,
+                        default=self.config_entry.options.get(
+                            CONF_REVISION_INTERVAL, DEFAULT_REVISION_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=720)),
+                }
+            ),
+        )
+
+
 def _get_schema_step_1(
     user_input: dict[str, Any] | None,
     default_dict: dict[str, Any],
@@ -259,71 +400,135 @@ def _get_schema_step_3(
     )
 
 
-async def _get_utility_list(hass, user_input) -> list | None:
-    """Return list of utilities by lat/lon."""
+def _can_apply_in_place(
+    entry: config_entries.ConfigEntry, data: dict[str, Any]
+) -> bool:
+    """Return if new data can be applied to the running entry without a reload.
+
+    Adding or removing the meter changes which sensors exist.
+    """
+    return entry.state is config_entries.ConfigEntryState.LOADED and bool(
+        entry.data.get(CONF_SENSOR)
+    ) == bool(data.get(CONF_SENSOR))
+
+
+def _get_lookup_key(hass: HomeAssistant, user_input: dict[str, Any]) -> LookupKey:
+    """Return the (API key, address, lat, lon, radius) a lookup depends on."""
     lat = None
     lon = None
-    api = user_input[CONF_API_KEY]
-    address = user_input[CONF_LOCATION]
-    radius = user_input[CONF_RADIUS]
+    address = user_input.get(CONF_LOCATION, "")
 
     if not bool(address):
         lat = hass.config.latitude
         lon = hass.config.longitude
         address = None
 
-    plans = openeihttp.Rates(
-        api=api,
-        lat=lat,
-        lon=lon,
-        radius=radius,
-        address=address,
-        session=async_get_clientsession(hass),
-    )
-    plans = await _lookup_plans(plans)
+    return user_input[CONF_API_KEY], address, lat, lon, user_input.get(CONF_RADIUS, 0)
+
+
+async def _get_plans(hass: HomeAssistant, key: LookupKey) -> dict:
+    """Return utilities and plans for a location, using a short-lived cache."""
+    cache = hass.data.setdefault(DATA_LOOKUP_CACHE, {})
+    now = monotonic()
+    if (cached := cache.get(key)) is not None and cached[0] > now:
+        _LOGGER.debug("Using cached plan lookup.")
+        return cached[1]
+
+    api, address, lat, lon, radius = key
+    handler = openeihttp.Rates(api=api, session=async_get_clientsession(hass))
+    params: dict[str, Any] = {"api_key": api}
+    if radius:
+        params["radius"] = radius
+    if address:
+        params["address"] = address
+    else:
+        params["lat"] = lat
+        params["lon"] = lon
+
+    plans = await _lookup_plans(handler, params, async_get_quota(hass, api))
+
+    for expired in [stale for stale, value in cache.items() if value[0] <= now]:
+        del cache[expired]
+    cache[key] = (now + LOOKUP_CACHE_TTL.total_seconds(), plans)
+    return plans
+
+
+def _get_utility_list(plans: dict) -> list:
+    """Return list of utilities."""
     utilities = list(plans.keys())
 
     _LOGGER.debug("get_utility_list: %s", utilities)
     return utilities
 
 
-async def _get_plan_list(hass, user_input) -> list | None:
-    """Return list of rate plans by lat/lon."""
-    lat = None
-    lon = None
-    address = user_input[CONF_LOCATION]
-    api = user_input[CONF_API_KEY]
-    radius = user_input[CONF_RADIUS]
-    utility = user_input[CONF_UTILITY]
-
-    if not bool(address):
-        lat = hass.config.latitude
-        lon = hass.config.longitude
-        address = None
-
-    plans = openeihttp.Rates(
-        api=api,
-        lat=lat,
-        lon=lon,
-        radius=radius,
-        address=address,
-        session=async_get_clientsession(hass),
-    )
-    plans = await _lookup_plans(plans)
+def _get_plan_list(plans: dict, user_input: dict[str, Any]) -> dict:
+    """Return rate plans of the selected utility."""
     value = {}
 
-    for plan in plans[utility]:
+    for plan in plans[user_input[CONF_UTILITY]]:
         value[plan["label"]] = plan["name"]
 
     _LOGGER.debug("get_plan_list: %s", value)
     return value
 
 
-async def _lookup_plans(handler) -> list:
-    """Return list of utilities and plans."""
-    response = await handler.lookup_plans()
-    _LOGGER.debug("lookup_plans: %s", response)
-    return response
+async def _lookup_plans(
+    handler: openeihttp.Rates, params: dict[str, Any], quota: ApiQuota
+) -> dict:
+    """Return current residential plans per utility, read one page at a time.
+
+    Every page is a request taken from the API key's quota.
+
+    Only the minimal plan detail is requested and expired or non residential
+    plans are dropped while parsing, so memory stays bounded by the page size.
+    Plans are read newest first and reading stops with a warning after
+    ``LOOKUP_MAX_PLANS``, which keeps a lookup within the request budget.
+    """
+    now = time()
+    params = {
+        **params,
+        "version": "latest",
+        "format": "json",
+        "detail": "minimal",
+        "orderby": "startdate",
+        "direction": "desc",
+        "sector": LOOKUP_SECTOR,
+        "effective_on_date": int(now),
+        "limit": LOOKUP_PAGE_SIZE,
+    }
+    rate_names: dict[str, list[dict[str, str]]] = {}
+    for offset in range(0, LOOKUP_MAX_PLANS, LOOKUP_PAGE_SIZE):
+        async with quota.async_request():
+            result = await handler.process_request({**params, "offset": offset})
+            if "error" in result:
+                err = result["error"]
+                message = err.get("message", err) if isinstance(err, dict) else err
+                _LOGGER.error("Error: %s", message)
+                if "You have exceeded your rate limit." in str(message):
+                    raise openeihttp.RateLimit
+                raise openeihttp.APIError
+
+        items = result.get("items", [])
+        for item in items:
+            if item.get("sector", LOOKUP_SECTOR) != LOOKUP_SECTOR:
+                continue
+            if (enddate := item.get("enddate")) is not None and enddate <= now:
+                continue
+            rate_names.setdefault(item["utility"], []).append(
+                {"name": item["name"], "label": item["label"]}
+            )
+        if len(items) < LOOKUP_PAGE_SIZE:
+            break
+    else:
+        _LOGGER.warning(
+            "Plan lookup stopped after the newest %s plans, use a smaller radius "
+            "if your utility or plan is not listed",
+            LOOKUP_MAX_PLANS,
+        )
+
+    _LOGGER.debug("lookup_plans: %s utilities", len(rate_names))
+    rate_names[NOT_LISTED] = [{"name": NOT_LISTED, "label": NOT_LISTED}]
+    return rate_names
 
 
 def _get_entities(
@@ -333,17 +538,7 @@ def _get_entities(
     extra_entities: str | None = None,
 ) -> list[str]:
     """Return entity IDs for the given domain, optionally filtered by device class."""
-    registry = er.async_get(hass)
-    data = [
-        entry.entity_id
-        for entry in registry.entities.values()
-        if entry.domain == domain
-        and (
-            search is None
-            or entry.device_class == search
-            or entry.original_device_class == search
-        )
-    ]
+    data = list(async_get_entity_index(hass).async_get(domain, search))
 
     if extra_entities:
         data.insert(0, extra_entities)
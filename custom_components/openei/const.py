@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
+from datetime import time, timedelta
 from typing import Final
 
 from homeassistant.components.binary_sensor import BinarySensorEntityDescription
-from homeassistant.components.sensor import SensorEntityDescription
-from homeassistant.const import Platform
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import Platform, UnitOfInformation, UnitOfTime
 from homeassistant.helpers.entity import EntityCategory
 
 # Base component constants
@@ -22,9 +27,36 @@ CONF_LOCATION = "location"
 CONF_MANUAL_PLAN = "manual_plan"
 CONF_PLAN = "rate_plan"
 CONF_RADIUS = "radius"
+CONF_REVISION_INTERVAL = "revision_interval"
 CONF_SENSOR = "sensor"
 CONF_UTILITY = "utility"
 
+# Downloaded plans, persisted by label
+STORAGE_KEY = f"{DOMAIN}.plans"
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10
+
+# Plan revision check interval in hours
+DEFAULT_REVISION_INTERVAL = 24
+
+# Daily revision checks are spread over this local time window
+OFF_PEAK_START = time(1, 0)
+OFF_PEAK_WINDOW = timedelta(hours=4)
+
+# Requests allowed per API key and hour, and the backoff after a rate limit
+API_HOURLY_QUOTA = 1000
+BACKOFF_MIN = timedelta(minutes=1)
+BACKOFF_MAX = timedelta(hours=6)
+
+# How long utility/plan lookups are reused by config flows
+LOOKUP_CACHE_TTL = timedelta(minutes=10)
+
+# Utility/plan lookups are read in pages of the most the API returns, up to a
+# number of plans that keeps a lookup well within the hourly request budget
+LOOKUP_PAGE_SIZE = 500
+LOOKUP_MAX_PLANS = 10000
+LOOKUP_SECTOR = "Residential"
+
 # property: name, icon, unit_of_measurement, device_class
 SENSOR_TYPES: Final[dict[str, SensorEntityDescription]] = {
     "current_rate": SensorEntityDescription(
@@ -90,6 +122,119 @@ SENSOR_TYPES: Final[dict[str, SensorEntityDescription]] = {
         name="Current Energy Sell Rate",
         icon="mdi:cash-multiple",
     ),
+    "api_budget": SensorEntityDescription(
+        key="api_budget",
+        name="API Request Budget",
+        icon="mdi:api",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+}
+
+# Created when a meter sensor is configured
+COST_SENSOR_TYPES: Final[dict[str, SensorEntityDescription]] = {
+    "energy_cost_today": SensorEntityDescription(
+        key="energy_cost_today",
+        name="Energy Cost Today",
+        icon="mdi:cash-clock",
+        device_class=SensorDeviceClass.MONETARY,
+        state_class=SensorStateClass.TOTAL,
+        suggested_display_precision=2,
+    ),
+    "bill_to_date": SensorEntityDescription(
+        key="bill_to_date",
+        name="Bill To Date",
+        icon="mdi:receipt-text",
+        device_class=SensorDeviceClass.MONETARY,
+        state_class=SensorStateClass.TOTAL,
+        suggested_display_precision=2,
+    ),
+}
+
+# Refresh timings and counters, enabled on demand
+DIAGNOSTIC_SENSOR_TYPES: Final[dict[str, SensorEntityDescription]] = {
+    "fetch_latency": SensorEntityDescription(
+        key="fetch_latency",
+        name="Last Fetch Latency",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        suggested_display_precision=0,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    "response_bytes": SensorEntityDescription(
+        key="response_bytes",
+        name="Last Response Size",
+        icon="mdi:download-network",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    "compile_time": SensorEntityDescription(
+        key="compile_time",
+        name="Plan Parse Time",
+        icon="mdi:timer-cog-outline",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        suggested_display_precision=2,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    "transform_time": SensorEntityDescription(
+        key="transform_time",
+        name="Transform Time",
+        icon="mdi:timer-cog-outline",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        suggested_display_precision=2,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    "cache_hits": SensorEntityDescription(
+        key="cache_hits",
+        name="Plan Cache Hits",
+        icon="mdi:database-check",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    "cache_misses": SensorEntityDescription(
+        key="cache_misses",
+        name="Plan Cache Misses",
+        icon="mdi:database-arrow-down",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    "rate_limit_events": SensorEntityDescription(
+        key="rate_limit_events",
+        name="Rate Limit Events",
+        icon="mdi:speedometer-slow",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    "consecutive_failures": SensorEntityDescription(
+        key="consecutive_failures",
+        name="Consecutive Failures",
+        icon="mdi:alert-circle-outline",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    "next_refresh": SensorEntityDescription(
+        key="next_refresh",
+        name="Next Refresh",
+        icon="mdi:update",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
 }
 
 BINARY_SENSORS: Final[dict[str, BinarySensorEntityDescription]] = {
@@ -100,3 +245,31 @@ BINARY_SENSORS: Final[dict[str, BinarySensorEntityDescription]] = {
         entity_category=EntityCategory.DIAGNOSTIC,
     ),
 }
+
+# Plan metadata, only updated when a new plan revision is applied
+METADATA_KEYS: Final = frozenset(
+    {
+        "approval",
+        "distributed_generation",
+        "fixedchargefirstmeter",
+        "mincharge",
+        "rate_name",
+    }
+)
+
+# Data fields shown as attributes of a sensor, by attribute name
+SENSOR_ATTRIBUTES: Final[dict[str, dict[str, str]]] = {
+    "current_rate": {"all_rates": "all_rates", "all_adjustments": "all_adjustments"},
+    "api_budget": {"backoff_until": "api_backoff_until"},
+}
+
+# Services
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_DEADLINE = "deadline"
+ATTR_DURATION = "duration"
+ATTR_EARLIEST_START = "earliest_start"
+ATTR_HOURS = "hours"
+ATTR_REFRESHES = "refreshes"
+SERVICE_FIND_CHEAPEST_WINDOW = "find_cheapest_window"
+SERVICE_GET_PRICE_FORECAST = "get_price_forecast"
+SERVICE_PROFILE_REFRESHES = "profile_refreshes"
@@ -0,0 +1,116 @@
+"""Energy cost accumulation for OpenEI."""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+# Units already reported as unsupported, so each is only logged once
+_unsupported_units: set[Any] = set()
+
+
+def _charge(charge: tuple[Any, Any] | None, days: int) -> float:
+    """Return a plan charge for the days billed so far in a monthly cycle."""
+    if charge is None or charge[0] is None:
+        return 0.0
+    value, unit = charge
+    if unit == "$/day":
+        return value * days
+    if unit == "$/month":
+        return value
+    if unit == "$/year":
+        return value / 12
+    if unit not in _unsupported_units:
+        _unsupported_units.add(unit)
+        _LOGGER.warning("Plan charges in %s are not supported, ignoring them", unit)
+    return 0.0
+
+
+class CostAccumulator:
+    """Integrate meter deltas times the effective rate into running totals.
+
+    Each reading is O(1); totals reset at the start of every day and every
+    calendar month billing cycle.
+    """
+
+    __slots__ = ("billing", "day", "last_reading", "period", "today")
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.day: date | None = None
+        self.period: tuple[int, int] | None = None
+        self.today = 0.0
+        self.billing = 0.0
+        self.last_reading: float | None = None
+
+    def roll(self, now: datetime) -> bool:
+        """Reset totals at day and billing cycle boundaries."""
+        changed = False
+        day = now.date()
+        if day != self.day:
+            if self.day is not None and self.today:
+                self.today = 0.0
+                changed = True
+            self.day = day
+
+        period = (now.year, now.month)
+        if period != self.period:
+            if self.period is not None and self.billing:
+                self.billing = 0.0
+                changed = True
+            self.period = period
+        return changed
+
+    def add(self, now: datetime, reading: float | None, price: float | None) -> bool:
+        """Charge the energy used since the last reading at ``price``.
+
+        Without a price the reading only becomes the new baseline.
+        """
+        changed = self.roll(now)
+        last = self.last_reading
+        self.last_reading = reading
+        if last is None or price is None:
+            return changed
+
+        delta = reading - last
+        if delta < 0:
+            # The meter was reset, everything it shows was used since
+            delta = reading
+        if not delta:
+            return changed
+
+        cost = delta * price
+        self.today += cost
+        self.billing += cost
+        return True
+
+    def bill(
+        self,
+        now: datetime,
+        fixedcharge: tuple[Any, Any] | None,
+        mincharge: tuple[Any, Any] | None,
+    ) -> float:
+        """Return the bill to date including fixed and minimum charges."""
+        total = self.billing + _charge(fixedcharge, now.day)
+        return max(total, _charge(mincharge, now.day))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the accumulator state for storage."""
+        return {
+            "day": self.day.isoformat() if self.day else None,
+            "period": list(self.period) if self.period else None,
+            "today": self.today,
+            "billing": self.billing,
+            "last_reading": self.last_reading,
+        }
+
+    def restore(self, state: dict[str, Any]) -> None:
+        """Restore the accumulator state from storage."""
+        self.day = date.fromisoformat(state["day"]) if state.get("day") else None
+        self.period = tuple(state["period"]) if state.get("period") else None
+        self.today = state.get("today") or 0.0
+        self.billing = state.get("billing") or 0.0
+        self.last_reading = state.get("last_reading")
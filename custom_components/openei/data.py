@@ -0,0 +1,61 @@
+"""Coordinator data snapshots for OpenEI."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Any
+
+
+@dataclass(frozen=True, slots=True)
+class OpenEIData:
+    """Rates evaluated at one point in time.
+
+    Snapshots are never changed once built, an update replaces the whole
+    snapshot so the previous one can be kept for change detection.
+    """
+
+    current_rate: float | None = None
+    current_adjustment: float | None = None
+    current_energy_rate_structure: int | None = None
+    next_energy_rate_structure: int | None = None
+    next_energy_rate_structure_time: datetime | None = None
+    all_rates: list[float] | None = None
+    all_adjustments: list[float] | None = None
+    monthly_tier_rate: float | None = None
+    current_sell_rate: float | None = None
+    api_budget: int | None = None
+    api_backoff_until: datetime | None = None
+    energy_cost_today: float | None = None
+    bill_to_date: float | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class OpenEIMetadata:
+    """Plan metadata, replaced only when a new plan revision is applied."""
+
+    rate_name: str | None = None
+    approval: bool | None = None
+    distributed_generation: str | None = None
+    mincharge: Any = None
+    mincharge_uom: str | None = None
+    fixedchargefirstmeter: Any = None
+    fixedchargefirstmeter_uom: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class OpenEIStats:
+    """Refresh timings and counters of an entry, for diagnostics."""
+
+    fetch_latency: float | None = None
+    response_bytes: int | None = None
+    compile_time: float | None = None
+    transform_time: float | None = None
+    cache_hits: int = 0
+    cache_misses: int = 0
+    rate_limit_events: int = 0
+    consecutive_failures: int = 0
+    next_refresh: datetime | None = None
+
+
+DATA_FIELDS: tuple[str, ...] = tuple(field.name for field in fields(OpenEIData))
@@ -0,0 +1,52 @@
+"""Diagnostics support for OpenEI."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.components.diagnostics import REDACTED, async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_API_KEY
+from .quota import async_get_quota
+
+TO_REDACT = {CONF_API_KEY}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = entry.runtime_data
+    api, plan = coordinator.plan_key
+    schedule = coordinator.schedule
+    quota = async_get_quota(hass, api)
+    last_exception = coordinator.last_exception
+    if last_exception is not None:
+        # Request errors can quote the URL, which carries the API key
+        last_exception = repr(last_exception).replace(api, REDACTED)
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "plan": {
+            "label": plan,
+            "revision": schedule.revision if schedule else None,
+            "enddate": schedule.enddate if schedule else None,
+        },
+        "refresh": {
+            "last_update_success": coordinator.last_update_success,
+            "last_exception": last_exception,
+            "skipped_writes": coordinator.skipped_writes,
+            **(asdict(coordinator.stats.data) if coordinator.stats.data else {}),
+        },
+        "quota": {
+            "remaining": quota.remaining,
+            "backoff_until": quota.backoff_until,
+        },
+        "data": asdict(coordinator.data) if coordinator.data else None,
+        "metadata": asdict(coordinator.metadata.data)
+        if coordinator.metadata.data
+        else None,
+    }
@@ -0,0 +1,84 @@
+"""Entity registry index used by the OpenEI config flow."""
+
+from __future__ import annotations
+
+from homeassistant.core import Event, HomeAssistant, callback, split_entity_id
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+DATA_ENTITY_INDEX: HassKey[EntityIndex] = HassKey(f"{DOMAIN}_entity_index")
+
+
+@callback
+def async_get_entity_index(hass: HomeAssistant) -> EntityIndex:
+    """Return the entity index, building it on first use."""
+    if (index := hass.data.get(DATA_ENTITY_INDEX)) is None:
+        index = hass.data[DATA_ENTITY_INDEX] = EntityIndex(hass)
+    return index
+
+
+class EntityIndex:
+    """Entity IDs indexed by domain and device class.
+
+    The registry is scanned once, afterwards the index follows entity
+    registry updates so lookups only touch matching entities.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize and build the index."""
+        self._registry = er.async_get(hass)
+        self._domains: dict[str, set[str]] = {}
+        self._classes: dict[tuple[str, str], set[str]] = {}
+        self._keys: dict[str, tuple[tuple[str, str], ...]] = {}
+
+        for entry in self._registry.entities.values():
+            self._add(entry)
+
+        hass.bus.async_listen(
+            er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_handle_event
+        )
+
+    @callback
+    def async_get(self, domain: str, device_class: str | None = None) -> set[str]:
+        """Return entity IDs of a domain, optionally filtered by device class."""
+        if device_class is None:
+            return self._domains.get(domain, set())
+        return self._classes.get((domain, device_class), set())
+
+    @callback
+    def _async_handle_event(
+        self, event: Event[er.EventEntityRegistryUpdatedData]
+    ) -> None:
+        """Keep the index in step with the entity registry."""
+        data = event.data
+        if data["action"] == "update" and "old_entity_id" in data:
+            self._remove(data["old_entity_id"])
+
+        self._remove(data["entity_id"])
+        if data["action"] != "remove" and (
+            entry := self._registry.async_get(data["entity_id"])
+        ):
+            self._add(entry)
+
+    def _add(self, entry: er.RegistryEntry) -> None:
+        """Index a registry entry."""
+        domain = entry.domain
+        self._domains.setdefault(domain, set()).add(entry.entity_id)
+        keys = tuple(
+            (domain, device_class)
+            for device_class in {entry.device_class, entry.original_device_class}
+            if device_class is not None
+        )
+        for key in keys:
+            self._classes.setdefault(key, set()).add(entry.entity_id)
+        self._keys[entry.entity_id] = keys
+
+    def _remove(self, entity_id: str) -> None:
+        """Drop an entity ID from the index."""
+        if (keys := self._keys.pop(entity_id, None)) is None:
+            return
+        self._domains[split_entity_id(entity_id)[0]].discard(entity_id)
+        for key in keys:
+            self._classes[key].discard(entity_id)
@@ -0,0 +1,300 @@
+"""Shared plan store for OpenEI config entries."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from time import monotonic
+from typing import Any
+
+import openeihttp
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.json import json_bytes
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN, STORAGE_KEY, STORAGE_SAVE_DELAY, STORAGE_VERSION
+from .quota import async_get_quota
+from .schedule import RateSchedule
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+DATA_PLAN_STORE: HassKey[OpenEIPlanStore] = HassKey(f"{DOMAIN}_plan_store")
+
+type PlanKey = tuple[str, str]
+
+
+@dataclass(frozen=True, slots=True)
+class FetchStats:
+    """Cost of the last download of a plan, times in milliseconds."""
+
+    latency: float
+    response_bytes: int
+    compile_time: float
+    decode_time: float | None = None
+
+
+@callback
+def async_get_plan_store(hass: HomeAssistant) -> OpenEIPlanStore:
+    """Return the domain wide plan store, creating it on first use."""
+    if (store := hass.data.get(DATA_PLAN_STORE)) is None:
+        store = hass.data[DATA_PLAN_STORE] = OpenEIPlanStore(hass)
+    return store
+
+
+class OpenEIPlanStore:
+    """Hold compiled plans keyed by (API key, plan label).
+
+    Concurrent fetches for the same key share a single request and the
+    compiled result is handed to every subscribed coordinator.  Downloaded
+    plans are persisted by label so a restart does not need the API.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self.hass = hass
+        self._plans: dict[PlanKey, RateSchedule] = {}
+        self._fetched: dict[PlanKey, datetime] = {}
+        self._fetch_stats: dict[PlanKey, FetchStats] = {}
+        self._profiled: dict[PlanKey, int] = {}
+        self._pending: dict[PlanKey, asyncio.Future[RateSchedule]] = {}
+        self._subscribers: dict[PlanKey, list[Callable[[RateSchedule], None]]] = {}
+        self._storage: Store[dict[str, Any]] = Store(
+            hass,
+            STORAGE_VERSION,
+            STORAGE_KEY,
+            atomic_writes=True,
+            serialize_in_event_loop=False,
+        )
+        self._stored: dict[str, dict[str, Any]] | None = None
+
+    @callback
+    def async_get(self, key: PlanKey) -> RateSchedule | None:
+        """Return the compiled plan for a key if one is held."""
+        return self._plans.get(key)
+
+    @callback
+    def async_last_fetch(self, key: PlanKey) -> datetime | None:
+        """Return when the plan for a key was last downloaded."""
+        return self._fetched.get(key)
+
+    @callback
+    def async_fetch_stats(self, key: PlanKey) -> FetchStats | None:
+        """Return the cost of the last download of the plan for a key."""
+        return self._fetch_stats.get(key)
+
+    @callback
+    def async_profile(self, key: PlanKey) -> CALLBACK_TYPE:
+        """Also time JSON decoding of downloads for a key until stopped."""
+        self._profiled[key] = self._profiled.get(key, 0) + 1
+
+        @callback
+        def _async_stop() -> None:
+            if count := self._profiled[key] - 1:
+                self._profiled[key] = count
+            else:
+                del self._profiled[key]
+
+        return _async_stop
+
+    @callback
+    def async_subscribe(
+        self, key: PlanKey, update_callback: Callable[[RateSchedule], None]
+    ) -> CALLBACK_TYPE:
+        """Subscribe to plan updates for a key."""
+        subscribers = self._subscribers.setdefault(key, [])
+        subscribers.append(update_callback)
+
+        @callback
+        def _async_unsubscribe() -> None:
+            subscribers.remove(update_callback)
+            if not subscribers:
+                del self._subscribers[key]
+                self._plans.pop(key, None)
+                self._fetched.pop(key, None)
+                self._fetch_stats.pop(key, None)
+
+        return _async_unsubscribe
+
+    async def async_restore(self, key: PlanKey) -> RateSchedule | None:
+        """Return the plan for a key, compiling the persisted copy if needed."""
+        if (schedule := self._plans.get(key)) is not None:
+            return schedule
+
+        stored = (await self._async_load()).get(key[1])
+        if not stored:
+            return None
+        try:
+            schedule = RateSchedule(stored["plan"])
+        except (KeyError, IndexError, TypeError, ValueError) as err:
+            _LOGGER.debug("Ignoring unusable stored plan %s: %s", key[1], err)
+            return None
+
+        # Another entry may have restored or fetched it in the meantime
+        if (current := self._plans.get(key)) is not None:
+            return current
+        self._plans[key] = schedule
+        if fetched := dt_util.parse_datetime(stored.get("fetched") or ""):
+            self._fetched[key] = fetched
+        return schedule
+
+    async def async_import(self, plan: str, cache_file: str) -> None:
+        """Move a plan cached by an older version into the store."""
+        cached = await self.hass.async_add_executor_job(_pop_cache_file, cache_file)
+        if cached is None:
+            return
+
+        stored = await self._async_load()
+        if plan not in stored:
+            _LOGGER.debug("Importing cached plan %s from %s", plan, cache_file)
+            data, fetched = cached
+            stored[plan] = {"fetched": fetched.isoformat(), "plan": data}
+            self._async_schedule_save()
+
+    async def async_remove(self, plan: str) -> None:
+        """Forget the persisted copy of a plan."""
+        if (await self._async_load()).pop(plan, None) is not None:
+            self._async_schedule_save()
+
+    async def async_fetch(self, key: PlanKey, force: bool = False) -> RateSchedule:
+        """Fetch and compile a plan, joining any request already in flight.
+
+        Unless ``force`` is set the persisted copy of the plan is used if present.
+        """
+        if (pending := self._pending.get(key)) is None:
+            pending = self._pending[key] = self.hass.async_create_task(
+                self._async_fetch(key, force),
+                f"{DOMAIN} fetch {key[1]}",
+                eager_start=False,
+            )
+        else:
+            _LOGGER.debug("Joining in-flight request for plan: %s", key[1])
+        return await asyncio.shield(pending)
+
+    async def _async_fetch(self, key: PlanKey, force: bool) -> RateSchedule:
+        """Fetch the plan from the API and fan out new revisions to subscribers."""
+        api, plan = key
+        try:
+            if not force and (schedule := await self.async_restore(key)):
+                return schedule
+            start = monotonic()
+            data = await self._async_download(api, plan)
+        finally:
+            del self._pending[key]
+
+        downloaded = monotonic()
+        current = self._plans.get(key)
+        if (
+            current is not None
+            and current.plan.get("label") == data.get("label")
+            and current.plan.get("revisions") == data.get("revisions")
+        ):
+            _LOGGER.debug("Plan %s unchanged at revision %s", plan, current.revision)
+            schedule = current
+        else:
+            schedule = RateSchedule(data)
+        compiled = monotonic()
+
+        # The library hands over decoded JSON, the plan is measured re-encoded
+        encoded = json_bytes(data)
+        decode_time: float | None = None
+        if key in self._profiled:
+            # The library decodes the response internally, decode it once more
+            # so the decode can be told apart from the network wait
+            decoding = monotonic()
+            json.loads(encoded)
+            decode_time = (monotonic() - decoding) * 1000
+
+        fetched = dt_util.utcnow()
+        self._plans[key] = schedule
+        self._fetched[key] = fetched
+        self._fetch_stats[key] = FetchStats(
+            latency=(downloaded - start) * 1000,
+            response_bytes=len(encoded),
+            compile_time=(compiled - downloaded) * 1000,
+            decode_time=decode_time,
+        )
+        stored = await self._async_load()
+        stored[plan] = {"fetched": fetched.isoformat(), "plan": schedule.plan}
+        if schedule is not current:
+            # An unchanged revision is not written, its fetch time is saved with
+            # the next change and a restart in between checks the plan once more
+            self._async_schedule_save()
+            for update_callback in list(self._subscribers.get(key, ())):
+                update_callback(schedule)
+        return schedule
+
+    async def _async_download(self, api: str, plan: str) -> dict[str, Any]:
+        """Request a plan, mapping errors the way ``Rates.update_data`` does.
+
+        The library call is bypassed because it also writes its own cache file.
+        """
+        rate = openeihttp.Rates(
+            api=api, plan=plan, session=async_get_clientsession(self.hass)
+        )
+        async with async_get_quota(self.hass, api).async_request():
+            result = await rate.process_request(
+                {
+                    "version": "latest",
+                    "format": "json",
+                    "detail": "full",
+                    "api_key": api,
+                    "getpage": plan,
+                }
+            )
+            if "error" in result:
+                err = result["error"]
+                message = err.get("message", err) if isinstance(err, dict) else err
+                _LOGGER.error("Error: %s", message)
+                if "You have exceeded your rate limit." in str(message):
+                    raise openeihttp.RateLimit
+                raise openeihttp.APIError
+
+        data = result.get("items", [None])[0]
+        assert data
+        return data
+
+    async def _async_load(self) -> dict[str, dict[str, Any]]:
+        """Return the persisted plans by label, loading them once."""
+        if self._stored is None:
+            stored = await self._storage.async_load()
+            if self._stored is None:
+                self._stored = (stored or {}).get("plans", {})
+        return self._stored
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Coalesce writes of the persisted plans.
+
+        The store serializes in the executor, so it is handed a copy taken on
+        the event loop. Plans are replaced rather than changed in place, which
+        keeps a shallow copy safe.
+        """
+        data = {"plans": dict(self._stored or {})}
+        self._storage.async_delay_save(lambda: data, STORAGE_SAVE_DELAY)
+
+
+def _pop_cache_file(cache_file: str) -> tuple[dict[str, Any], datetime] | None:
+    """Read and remove a plan cache file written by openeihttp."""
+    try:
+        fetched = dt_util.utc_from_timestamp(os.path.getmtime(cache_file))
+        with open(cache_file, encoding="utf-8") as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as err:
+        _LOGGER.debug("Unable to read cache file %s: %s", cache_file, err)
+        data = None
+
+    try:
+        os.remove(cache_file)
+    except OSError:
+        pass
+    return (data, fetched) if data else None
@@ -0,0 +1,84 @@
+"""Refresh profiling for OpenEI."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from time import monotonic
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+# Phases of a refresh, in the order they happen
+PHASES = ("network", "json_decode", "processing", "fan_out")
+
+# The library decodes responses itself, so the decode is timed on a copy of the
+# payload and the network wait is the fetch latency less that estimate
+ESTIMATED_PHASES = ("network", "json_decode")
+
+
+class RefreshProfiler:
+    """Time the phases of an entry's refreshes.
+
+    Samples are taken until a number of refreshes has been profiled or a
+    deadline has passed, whichever comes first.
+    """
+
+    __slots__ = ("_current", "_started", "deadline", "path", "remaining", "samples")
+
+    def __init__(
+        self, path: str, refreshes: int | None, deadline: datetime | None
+    ) -> None:
+        """Initialize."""
+        self.path = path
+        self.remaining = refreshes
+        self.deadline = deadline
+        self.samples: list[dict[str, Any]] = []
+        self._current: dict[str, Any] | None = None
+        self._started = 0.0
+
+    @property
+    def active(self) -> bool:
+        """Return if a refresh is being profiled right now."""
+        return self._current is not None
+
+    def start(self) -> None:
+        """Start profiling a refresh."""
+        self._current = {
+            "start": dt_util.utcnow().isoformat(),
+            **dict.fromkeys(PHASES, 0.0),
+        }
+        self._started = monotonic()
+
+    def add(self, phase: str, milliseconds: float) -> None:
+        """Add time spent in a phase of the refresh being profiled."""
+        if self._current is not None:
+            self._current[phase] += milliseconds
+
+    def finish(self) -> bool:
+        """Finish the refresh being profiled and return if profiling is done."""
+        if (current := self._current) is None:
+            return False
+        current["total"] = (monotonic() - self._started) * 1000
+        self.samples.append(current)
+        self._current = None
+        if self.remaining is not None:
+            self.remaining -= 1
+            return self.remaining <= 0
+        return False
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the samples and per phase summary in milliseconds."""
+        summary = {}
+        for phase in (*PHASES, "total"):
+            values = [sample[phase] for sample in self.samples]
+            summary[phase] = {
+                "min": min(values, default=None),
+                "mean": sum(values) / len(values) if values else None,
+                "max": max(values, default=None),
+            }
+        return {
+            "refreshes": len(self.samples),
+            "estimated_phases": list(ESTIMATED_PHASES),
+            "summary": summary,
+            "samples": self.samples,
+        }
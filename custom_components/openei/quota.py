@@ -0,0 +1,105 @@
+"""API request budget shared by everything using an OpenEI API key."""
+
+from __future__ import annotations
+
+import logging
+import random
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from time import monotonic
+
+import openeihttp
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+from homeassistant.util.hass_dict import HassKey
+
+from .const import API_HOURLY_QUOTA, BACKOFF_MAX, BACKOFF_MIN, DOMAIN
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+DATA_QUOTA: HassKey[dict[str, ApiQuota]] = HassKey(f"{DOMAIN}_quota")
+
+
+class QuotaExceeded(openeihttp.RateLimit):
+    """Raised instead of making a request the API key has no budget for."""
+
+
+@callback
+def async_get_quota(hass: HomeAssistant, api: str) -> ApiQuota:
+    """Return the request budget of an API key, creating it on first use."""
+    quotas = hass.data.setdefault(DATA_QUOTA, {})
+    if (quota := quotas.get(api)) is None:
+        quota = quotas[api] = ApiQuota()
+    return quota
+
+
+class ApiQuota:
+    """Token bucket holding the hourly request quota of one API key.
+
+    After the API reports a rate limit no requests are made until an
+    exponentially growing, jittered backoff has passed.
+    """
+
+    def __init__(self, capacity: int = API_HOURLY_QUOTA) -> None:
+        """Initialize with a full bucket."""
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = monotonic()
+        self._blocked_until = 0.0
+        self._failures = 0
+
+    @property
+    def remaining(self) -> int:
+        """Return the number of requests that can be made right now."""
+        self._refill()
+        return int(self._tokens)
+
+    @property
+    def backoff_until(self) -> datetime | None:
+        """Return when requests may be made again after a rate limit."""
+        if (delay := self._blocked_until - monotonic()) <= 0:
+            return None
+        return dt_util.utcnow() + timedelta(seconds=delay)
+
+    @asynccontextmanager
+    async def async_request(self) -> AsyncIterator[None]:
+        """Take a token for one request and track rate limit responses."""
+        self._acquire()
+        try:
+            yield
+        except QuotaExceeded:
+            raise
+        except openeihttp.RateLimit:
+            self._rate_limited()
+            raise
+        self._failures = 0
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last update."""
+        now = monotonic()
+        earned = (now - self._updated) * self._capacity / 3600
+        self._tokens = min(self._capacity, self._tokens + earned)
+        self._updated = now
+
+    def _acquire(self) -> None:
+        """Take a token or raise if there is no budget."""
+        if (delay := self._blocked_until - monotonic()) > 0:
+            raise QuotaExceeded(f"backing off for {delay:.0f}s after a rate limit")
+        self._refill()
+        if self._tokens < 1:
+            raise QuotaExceeded("hourly request budget used up")
+        self._tokens -= 1
+
+    def _rate_limited(self) -> None:
+        """Empty the bucket and back off after the API reported a rate limit."""
+        self._failures += 1
+        delay = min(
+            BACKOFF_MAX.total_seconds(),
+            BACKOFF_MIN.total_seconds() * 2 ** (self._failures - 1),
+        )
+        delay = random.uniform(delay / 2, delay)
+        _LOGGER.debug("Rate limited %s times, backing off %.0fs", self._failures, delay)
+        self._tokens = 0.0
+        self._updated = monotonic()
+        self._blocked_until = self._updated + delay
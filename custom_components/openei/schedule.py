@@ -0,0 +1,351 @@
+"""Compiled rate schedule for OpenEI plans."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from datetime import UTC, date, datetime, time, timedelta
+from itertools import accumulate
+from typing import Any
+
+WEEKDAY = 0
+WEEKEND = 1
+
+
+def _row_index(month: int, weekend: int) -> int:
+    """Return the row index for a 1-based month and weekday/weekend flag."""
+    return (month - 1) * 2 + weekend
+
+
+def _hour_starts(start: datetime, hours: int) -> list[datetime]:
+    """Return the starts of the hours from ``start``.
+
+    Hours are stepped in UTC, so a wall clock hour skipped by a daylight
+    saving change is left out and a repeated one appears twice.
+    """
+    first = start.replace(minute=0, second=0, microsecond=0)
+    if first.tzinfo is None:
+        return [first + timedelta(hours=offset) for offset in range(hours)]
+    utc = first.astimezone(UTC)
+    return [
+        (utc + timedelta(hours=offset)).astimezone(first.tzinfo)
+        for offset in range(hours)
+    ]
+
+
+class RateSchedule:
+    """Precomputed month x day type x hour lookup tables for a rate plan.
+
+    The OpenEI plan document is compiled once; every lookup afterwards is a
+    couple of tuple indexes and never touches the network.
+    """
+
+    def __init__(self, plan: dict[str, Any]) -> None:
+        """Compile the plan document."""
+        self.plan = plan
+        self._rows: tuple[tuple[int, ...], ...] | None = None
+        self._next_diff: tuple[tuple[int | None, ...], ...] = ()
+        self._first_other: tuple[dict[int, int], ...] = ()
+        self._rates: tuple[float, ...] = ()
+        self._adjustments: tuple[float | None, ...] = ()
+        self._tier_adjustments: tuple[float | None, ...] = ()
+        self._sell_rates: tuple[float | None, ...] = ()
+        self._tier_maxima: tuple[tuple[float, ...], ...] = ()
+        self._monthly_maxima: tuple[tuple[float, ...], ...] = ()
+        self._tier_rates: tuple[tuple[float, ...], ...] = ()
+        self.all_rates: tuple[list[float], list[float]] | None = None
+        self._hourly: dict[int, tuple[array, array]] = {}
+        self._windows: dict[
+            tuple[datetime, int, int], tuple[datetime, float] | None
+        ] = {}
+
+        structure = plan.get("energyratestructure")
+        if structure is None:
+            return
+
+        weekday = plan["energyweekdayschedule"]
+        weekend = plan["energyweekendschedule"]
+        rows = []
+        for month in range(12):
+            rows.append(tuple(weekday[month]))
+            rows.append(tuple(weekend[month]))
+        self._rows = tuple(rows)
+
+        periods = {period for row in rows for period in row}
+        next_diff = []
+        first_other = []
+        for row in rows:
+            diffs: list[int | None] = []
+            for hour in range(24):
+                diffs.append(
+                    next(
+                        (nxt for nxt in range(hour + 1, 24) if row[nxt] != row[hour]),
+                        None,
+                    )
+                )
+            next_diff.append(tuple(diffs))
+            others = {}
+            for period in periods:
+                hour = next((hr for hr in range(24) if row[hr] != period), None)
+                if hour is not None:
+                    others[period] = hour
+            first_other.append(others)
+        self._next_diff = tuple(next_diff)
+        self._first_other = tuple(first_other)
+
+        rates = []
+        adjustments = []
+        tier_adjustments = []
+        sell_rates = []
+        tier_maxima = []
+        monthly_maxima = []
+        tier_rates = []
+        all_adjustments = []
+        for tier_data in structure:
+            first = tier_data[0]
+            last = tier_data[-1]
+            rates.append(first["rate"])
+            adjustments.append(first.get("adj"))
+            tier_adjustments.append(last["adj"] if "adj" in last else first.get("adj"))
+            sell_rates.append(first.get("sell"))
+            # A running maximum keeps the tiers sorted for bisection while
+            # still selecting the first tier whose maximum exceeds a reading.
+            limited = [tier for tier in tier_data if "max" in tier]
+            maxima = tuple(accumulate((tier["max"] for tier in limited), max))
+            tier_maxima.append(maxima)
+            monthly_maxima.append(tuple(maximum * 29 for maximum in maxima))
+            tier_rates.append(tuple(tier["rate"] for tier in limited) + (last["rate"],))
+            if "adj" in first:
+                all_adjustments.append(first["adj"])
+        self._rates = tuple(rates)
+        self._adjustments = tuple(adjustments)
+        self._tier_adjustments = tuple(tier_adjustments)
+        self._sell_rates = tuple(sell_rates)
+        self._tier_maxima = tuple(tier_maxima)
+        self._monthly_maxima = tuple(monthly_maxima)
+        self._tier_rates = tuple(tier_rates)
+        self.all_rates = (rates, all_adjustments)
+
+    def period(self, when: datetime) -> int | None:
+        """Return the energy rate structure in effect at a point in time."""
+        if self._rows is None:
+            return None
+        return self._rows[_row_index(when.month, when.weekday() > 4)][when.hour]
+
+    def rate(self, when: datetime, reading: float = 0.0) -> float | None:
+        """Return the energy rate, honouring tiers when a reading is given."""
+        period = self.period(when)
+        if period is None:
+            return None
+        if reading:
+            rates = self._tier_rates[period]
+            return rates[bisect_right(self._tier_maxima[period], reading)]
+        return self._rates[period]
+
+    def adjustment(self, when: datetime, reading: float = 0.0) -> float | None:
+        """Return the energy rate adjustment."""
+        period = self.period(when)
+        if period is None:
+            return None
+        if reading:
+            return self._tier_adjustments[period]
+        return self._adjustments[period]
+
+    def tier_rate(self, when: datetime, reading: float = 0.0) -> float | None:
+        """Return the monthly tier rate for an accumulated meter reading."""
+        period = self.period(when)
+        if period is None or not reading:
+            return None
+        rates = self._tier_rates[period]
+        return rates[bisect_right(self._monthly_maxima[period], reading)]
+
+    def sell_rate(self, when: datetime) -> float | None:
+        """Return the energy sell rate."""
+        period = self.period(when)
+        if period is None:
+            return None
+        return self._sell_rates[period]
+
+    def next_change(self, when: datetime) -> tuple[datetime | None, int | None]:
+        """Return when the energy rate structure next changes, and to what.
+
+        Searches up to a year ahead and returns ``(None, current)`` if the
+        structure never changes.
+        """
+        if self._rows is None:
+            return None, None
+
+        row = _row_index(when.month, when.weekday() > 4)
+        current = self._rows[row][when.hour]
+        hour = self._next_diff[row][when.hour]
+        if hour is not None:
+            return self._at(when, when.date(), hour), self._rows[row][hour]
+
+        day = when.date() + timedelta(days=1)
+        limit = when.date() + timedelta(days=366)
+        while day <= limit:
+            weekday_row = _row_index(day.month, WEEKDAY)
+            if (
+                current not in self._first_other[weekday_row]
+                and current not in self._first_other[weekday_row + WEEKEND]
+            ):
+                day = _next_month(day)
+                continue
+            row = weekday_row + (day.weekday() > 4)
+            hour = self._first_other[row].get(current)
+            if hour is not None:
+                return self._at(when, day, hour), self._rows[row][hour]
+            day += timedelta(days=1)
+
+        return None, current
+
+    def hourly_prices(self, year: int) -> tuple[array, array] | None:
+        """Return the rate and adjustment of every hour in a year.
+
+        The vectors are indexed by ``day_of_year * 24 + hour`` in wall clock
+        time and built once per year for each compiled plan.
+        """
+        if self._rows is None:
+            return None
+        if (prices := self._hourly.get(year)) is not None:
+            return prices
+
+        row_rates = [array("d", (self._rates[p] for p in row)) for row in self._rows]
+        row_adjustments = [
+            array("d", (self._adjustments[p] or 0.0 for p in row)) for row in self._rows
+        ]
+        rates = array("d")
+        adjustments = array("d")
+        day = date(year, 1, 1)
+        while day.year == year:
+            row = _row_index(day.month, day.weekday() > 4)
+            rates.extend(row_rates[row])
+            adjustments.extend(row_adjustments[row])
+            day += timedelta(days=1)
+
+        # Keep the current and next year only
+        for stale in [cached for cached in self._hourly if cached < year - 1]:
+            del self._hourly[stale]
+        prices = self._hourly[year] = (rates, adjustments)
+        return prices
+
+    def price_slice(self, start: datetime, hours: int) -> tuple[array, array]:
+        """Return rate and adjustment vectors for the hours from ``start``.
+
+        Each hour is priced by its wall clock time, see ``_hour_starts``.
+        """
+        rates = array("d")
+        adjustments = array("d")
+        year = None
+        first_day = 0
+        for when in _hour_starts(start, hours):
+            if when.year != year:
+                year = when.year
+                if (prices := self.hourly_prices(year)) is None:
+                    break
+                first_day = date(year, 1, 1).toordinal()
+            index = (when.toordinal() - first_day) * 24 + when.hour
+            rates.append(prices[0][index])
+            adjustments.append(prices[1][index])
+        return rates, adjustments
+
+    def forecast(
+        self, start: datetime, hours: int
+    ) -> list[tuple[datetime, float, float]]:
+        """Return (hour start, rate, adjustment) for the hours from ``start``."""
+        rates, adjustments = self.price_slice(start, hours)
+        return list(
+            zip(_hour_starts(start, len(rates)), rates, adjustments, strict=True)
+        )
+
+    def cheapest_window(
+        self, start: datetime, hours: int, duration: int
+    ) -> tuple[datetime, float] | None:
+        """Return the start and average price of the cheapest window.
+
+        Looks for ``duration`` consecutive hours within the ``hours`` from
+        ``start`` using a sliding sum of rate plus adjustment.
+        """
+        key = (start, hours, duration)
+        if key in self._windows:
+            return self._windows[key]
+
+        rates, adjustments = self.price_slice(start, hours)
+        result = None
+        if duration <= len(rates):
+            total = sum(rates[:duration]) + sum(adjustments[:duration])
+            best = total
+            best_offset = 0
+            for offset in range(duration, len(rates)):
+                total += (
+                    rates[offset]
+                    + adjustments[offset]
+                    - rates[offset - duration]
+                    - adjustments[offset - duration]
+                )
+                if total < best - 1e-9:
+                    best = total
+                    best_offset = offset - duration + 1
+            result = (_hour_starts(start, best_offset + 1)[-1], best / duration)
+
+        if len(self._windows) >= 256:
+            self._windows.clear()
+        self._windows[key] = result
+        return result
+
+    @staticmethod
+    def _at(when: datetime, day: date, hour: int) -> datetime:
+        """Return the start of an hour on a day in the timezone of ``when``."""
+        return datetime.combine(day, time(hour), tzinfo=when.tzinfo)
+
+    @property
+    def revision(self) -> int | None:
+        """Return the latest revision timestamp of the plan."""
+        revisions = self.plan.get("revisions")
+        return revisions[-1] if revisions else None
+
+    @property
+    def enddate(self) -> datetime | None:
+        """Return when the plan stops being effective."""
+        if (enddate := self.plan.get("enddate")) is None:
+            return None
+        return datetime.fromtimestamp(enddate, UTC)
+
+    @property
+    def rate_name(self) -> str:
+        """Return the rate name."""
+        return self.plan["name"]
+
+    @property
+    def approval(self) -> bool:
+        """Return if the rate is approved."""
+        return self.plan["approved"]
+
+    @property
+    def distributed_generation(self) -> str | None:
+        """Return the distributed generation name."""
+        return self.plan.get("dgrules")
+
+    @property
+    def mincharge(self) -> tuple[Any, Any] | None:
+        """Return the minimum charge and its unit."""
+        if "mincharge" in self.plan:
+            return self.plan["mincharge"], self.plan["minchargeunits"]
+        return None
+
+    @property
+    def fixedchargefirstmeter(self) -> tuple[Any, Any] | None:
+        """Return the fixed charge for the first meter and its unit."""
+        if "fixedchargefirstmeter" in self.plan:
+            return (
+                self.plan["fixedchargefirstmeter"],
+                self.plan["fixedchargeunits"],
+            )
+        return None
+
+
+def _next_month(day: date) -> date:
+    """Return the first day of the month after ``day``."""
+    if day.month == 12:
+        return date(day.year + 1, 1, 1)
+    return date(day.year, day.month + 1, 1)
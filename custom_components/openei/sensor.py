@@ -1,15 +1,38 @@
 """Sensor platform for OpenEI."""
 
+from datetime import datetime, time
+from operator import attrgetter
 from typing import Any
 
-from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
+from homeassistant.components.sensor import (
+    RestoreSensor,
+    SensorEntity,
+    SensorEntityDescription,
+)
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.restore_state import ExtraStoredData, RestoredExtraData
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 from homeassistant.util import slugify
 
-from .const import ATTRIBUTION, DOMAIN, SENSOR_TYPES
+from .const import (
+    ATTRIBUTION,
+    CONF_SENSOR,
+    COST_SENSOR_TYPES,
+    DIAGNOSTIC_SENSOR_TYPES,
+    DOMAIN,
+    METADATA_KEYS,
+    SENSOR_ATTRIBUTES,
+    SENSOR_TYPES,
+)
+
+# Sensors priced per kWh, and sensors whose unit is part of the plan
+PRICE_KEYS = frozenset(
+    {"current_adjustment", "current_rate", "current_sell_rate", "monthly_tier_rate"}
+)
+PLAN_UNIT_KEYS = frozenset({"fixedchargefirstmeter", "mincharge"})
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_devices):
@@ -20,7 +43,24 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_d
     for sensor_key, sensor_description in SENSOR_TYPES.items():
         if sensor_key == "all_rates":
             continue
-        sensors.append(OpenEISensor(sensor_description, entry, coordinator))
+        sensors.append(
+            OpenEISensor(
+                sensor_description,
+                entry,
+                coordinator.metadata if sensor_key in METADATA_KEYS else coordinator,
+            )
+        )
+
+    if entry.data.get(CONF_SENSOR):
+        sensors.extend(
+            OpenEICostSensor(sensor_description, entry, coordinator)
+            for sensor_description in COST_SENSOR_TYPES.values()
+        )
+
+    sensors.extend(
+        OpenEIDiagnosticSensor(sensor_description, entry, coordinator.stats)
+        for sensor_description in DIAGNOSTIC_SENSOR_TYPES.values()
+    )
 
     async_add_devices(sensors, False)
 
@@ -29,6 +69,9 @@ class OpenEISensor(CoordinatorEntity, SensorEntity):
     """OpenEI Sensor class."""
 
     _attr_attribution = ATTRIBUTION
+    # The full rate tables stay available as attributes but are not stored by
+    # the recorder on every state change.
+    _unrecorded_attributes = frozenset({"all_rates", "all_adjustments"})
 
     def __init__(
         self,
@@ -37,35 +80,50 @@ class OpenEISensor(CoordinatorEntity, SensorEntity):
         coordinator,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, sensor_description.key)
         self._name = sensor_description.name
         self._key = sensor_description.key
         self._unique_id = entry.entry_id
         self._config = entry
-        self._icon = sensor_description.icon
         self.coordinator = coordinator
 
+        # Everything but the value is bound once, state writes only read it
+        self._value = attrgetter(self._key)
+        self._unit = (
+            attrgetter(f"{self._key}_uom") if self._key in PLAN_UNIT_KEYS else None
+        )
+        self._attributes = tuple(
+            (name, attrgetter(field))
+            for name, field in SENSOR_ATTRIBUTES.get(self._key, {}).items()
+        )
+        self._attr_native_unit_of_measurement = (
+            f"{coordinator.hass.config.currency}/kWh"
+            if self._key in PRICE_KEYS
+            else None
+        )
+        self._attr_icon = sensor_description.icon
+        self._attr_device_info = DeviceInfo(
+            entry_type=DeviceEntryType.SERVICE,
+            identifiers={(DOMAIN, self._config.entry_id)},
+            manufacturer="OpenEI",
+            name="OpenEI",
+        )
         self._attr_name = f"{slugify(self._config.title)}_{self._name}"
         self._attr_unique_id = f"{self._key}_{self._unique_id}"
 
     @property
     def native_value(self) -> Any:
         """Return the value of the sensor."""
-        return self.coordinator.data.get(self._key)
+        if (data := self.coordinator.data) is None:
+            return None
+        return self._value(data)
 
     @property
-    def native_unit_of_measurement(self) -> Any:
+    def native_unit_of_measurement(self) -> str | None:
         """Return the unit of measurement."""
-        if self._key in [
-            "current_adjustment",
-            "current_rate",
-            "monthly_tier_rate",
-            "current_sell_rate",
-        ]:
-            return f"{self.hass.config.currency}/kWh"
-        if f"{self._key}_uom" in self.coordinator.data:
-            return self.coordinator.data.get(f"{self._key}_uom")
-        return None
+        if self._unit is None or (data := self.coordinator.data) is None:
+            return self._attr_native_unit_of_measurement
+        return self._unit(data)
 
     @property
     def available(self) -> bool:
@@ -75,23 +133,63 @@ class OpenEISensor(CoordinatorEntity, SensorEntity):
     @property
     def extra_state_attributes(self) -> dict | None:
         """Return sensor attributes."""
-        attrs = {}
-        if self._key == "current_rate":
-            attrs["all_rates"] = self.coordinator.data.get("all_rates")
-            attrs["all_adjustments"] = self.coordinator.data.get("all_adjustments")
-        return attrs
+        if not self._attributes or (data := self.coordinator.data) is None:
+            return None
+        return {name: getter(data) for name, getter in self._attributes}
+
+
+class OpenEICostSensor(OpenEISensor, RestoreSensor):
+    """OpenEI energy cost sensor, persisted across restarts."""
+
+    def __init__(
+        self,
+        sensor_description: SensorEntityDescription,
+        entry: ConfigEntry,
+        coordinator,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(sensor_description, entry, coordinator)
+        self.entity_description = sensor_description
+        self._attr_native_unit_of_measurement = coordinator.hass.config.currency
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the accumulated totals."""
+        await super().async_added_to_hass()
+        if (extra := await self.async_get_last_extra_data()) is not None:
+            self.coordinator.async_restore_cost(extra.as_dict())
 
     @property
-    def icon(self) -> str:
-        """Return the icon."""
-        return self._icon
+    def extra_restore_state_data(self) -> ExtraStoredData:
+        """Return the accumulator state to persist."""
+        return RestoredExtraData(self.coordinator.cost.as_dict())
 
     @property
-    def device_info(self) -> DeviceInfo:
-        """Return device registry information."""
-        return DeviceInfo(
-            entry_type=DeviceEntryType.SERVICE,
-            identifiers={(DOMAIN, self._config.entry_id)},
-            manufacturer="OpenEI",
-            name="OpenEI",
+    def last_reset(self) -> datetime | None:
+        """Return the start of the current day or billing cycle."""
+        cost = self.coordinator.cost
+        if self._key == "energy_cost_today":
+            if cost.day is None:
+                return None
+            start = cost.day
+        else:
+            if cost.period is None:
+                return None
+            start = datetime(*cost.period, 1).date()
+        return datetime.combine(start, time(), dt_util.get_default_time_zone())
+
+
+class OpenEIDiagnosticSensor(OpenEISensor):
+    """OpenEI refresh timing or counter sensor."""
+
+    def __init__(
+        self,
+        sensor_description: SensorEntityDescription,
+        entry: ConfigEntry,
+        coordinator,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(sensor_description, entry, coordinator)
+        self.entity_description = sensor_description
+        self._attr_native_unit_of_measurement = (
+            sensor_description.native_unit_of_measurement
         )
@@ -0,0 +1,199 @@
+"""Services for OpenEI."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.service import async_register_admin_service
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_DEADLINE,
+    ATTR_DURATION,
+    ATTR_EARLIEST_START,
+    ATTR_HOURS,
+    ATTR_REFRESHES,
+    DOMAIN,
+    SERVICE_FIND_CHEAPEST_WINDOW,
+    SERVICE_GET_PRICE_FORECAST,
+    SERVICE_PROFILE_REFRESHES,
+)
+
+if TYPE_CHECKING:
+    from . import OpenEIDataUpdateCoordinator
+    from .schedule import RateSchedule
+
+# A leap year of hours, the longest span the services will price
+MAX_HOURS = 8784
+
+GET_PRICE_FORECAST_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_HOURS, default=48): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_HOURS)
+        ),
+    }
+)
+
+FIND_CHEAPEST_WINDOW_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_DURATION): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=168)
+        ),
+        vol.Optional(ATTR_EARLIEST_START): cv.datetime,
+        vol.Optional(ATTR_DEADLINE): cv.datetime,
+    }
+)
+
+PROFILE_REFRESHES_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_REFRESHES): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=1000)
+        ),
+        vol.Optional(ATTR_DURATION): vol.All(cv.time_period, cv.positive_timedelta),
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the OpenEI services."""
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_PRICE_FORECAST,
+        _async_get_price_forecast,
+        schema=GET_PRICE_FORECAST_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FIND_CHEAPEST_WINDOW,
+        _async_find_cheapest_window,
+        schema=FIND_CHEAPEST_WINDOW_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_PROFILE_REFRESHES,
+        _async_profile_refreshes,
+        schema=PROFILE_REFRESHES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+def _get_coordinator(
+    hass: HomeAssistant, call: ServiceCall
+) -> OpenEIDataUpdateCoordinator:
+    """Return the coordinator of the config entry a service call targets."""
+    entry = hass.config_entries.async_get_entry(call.data[ATTR_CONFIG_ENTRY_ID])
+    if (
+        entry is None
+        or entry.domain != DOMAIN
+        or entry.state is not ConfigEntryState.LOADED
+    ):
+        raise ServiceValidationError(
+            f"OpenEI entry {call.data[ATTR_CONFIG_ENTRY_ID]} is not loaded."
+        )
+    return entry.runtime_data
+
+
+def _get_schedule(hass: HomeAssistant, call: ServiceCall) -> RateSchedule:
+    """Return the compiled plan of the config entry a service call targets."""
+    schedule = _get_coordinator(hass, call).schedule
+    if schedule is None:
+        raise ServiceValidationError("Rate plan data is not available yet.")
+    return schedule
+
+
+async def _async_get_price_forecast(call: ServiceCall) -> ServiceResponse:
+    """Return hourly prices starting with the current hour."""
+    schedule = _get_schedule(call.hass, call)
+    start = dt_util.now().replace(minute=0, second=0, microsecond=0)
+    return {
+        "forecast": [
+            {
+                "start": hour_start.isoformat(),
+                "rate": rate,
+                "adjustment": adjustment,
+            }
+            for hour_start, rate, adjustment in schedule.forecast(
+                start, call.data[ATTR_HOURS]
+            )
+        ]
+    }
+
+
+def _as_local(value: datetime) -> datetime:
+    """Return a datetime in local time, treating naive values as local."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=dt_util.get_default_time_zone())
+    return dt_util.as_local(value)
+
+
+async def _async_find_cheapest_window(call: ServiceCall) -> ServiceResponse:
+    """Return the cheapest window of whole hours between a start and a deadline."""
+    schedule = _get_schedule(call.hass, call)
+    duration = call.data[ATTR_DURATION]
+    now = dt_util.now()
+    earliest = max(_as_local(call.data.get(ATTR_EARLIEST_START) or now), now)
+    deadline = _as_local(call.data.get(ATTR_DEADLINE) or earliest + timedelta(hours=24))
+
+    # Windows start on whole hours and must end by the deadline
+    start = earliest.replace(minute=0, second=0, microsecond=0)
+    if start < earliest:
+        start += timedelta(hours=1)
+    hours = int((deadline - start).total_seconds() // 3600)
+    if hours <= 0:
+        raise ServiceValidationError(
+            f"The deadline {deadline} must be at least an hour after {start}."
+        )
+    if hours > MAX_HOURS:
+        raise ServiceValidationError(
+            f"The window from {start} to {deadline} is longer than {MAX_HOURS} hours."
+        )
+
+    if (window := schedule.cheapest_window(start, hours, duration)) is None:
+        raise ServiceValidationError(
+            f"No {duration} hour window fits between {earliest} and {deadline}."
+        )
+
+    window_start, average = window
+    return {
+        "start": window_start.isoformat(),
+        "end": (window_start + timedelta(hours=duration)).isoformat(),
+        "average_price": average,
+    }
+
+
+async def _async_profile_refreshes(call: ServiceCall) -> ServiceResponse:
+    """Start profiling refreshes of an entry and return the profile file."""
+    coordinator = _get_coordinator(call.hass, call)
+    if coordinator.profiling:
+        raise ServiceValidationError(
+            f"OpenEI entry {call.data[ATTR_CONFIG_ENTRY_ID]} is already being profiled."
+        )
+
+    duration = call.data.get(ATTR_DURATION)
+    refreshes = call.data.get(ATTR_REFRESHES, 1 if duration is None else None)
+    stamp = dt_util.utcnow().strftime("%Y%m%d%H%M%S")
+    path = call.hass.config.path(
+        f"openei_profile.{call.data[ATTR_CONFIG_ENTRY_ID]}.{stamp}.json"
+    )
+    coordinator.async_start_profile(path, refreshes, duration)
+    return {"file": path}
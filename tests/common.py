@@ -8,3 +8,36 @@ def load_fixture(filename):
     path = os.path.join(os.path.dirname(__file__), "fixtures", filename)
     with open(path, encoding="utf-8") as fptr:
         return fptr.read()
+
+
+def run_sync(coro):
+    """Run a coroutine that completes without waiting on the event loop."""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coro.close()
+    raise AssertionError("Coroutine did not complete synchronously")
+
+
+def synthetic_lookup(utilities, plans):
+    """Return lookup items for many plans spread over many utilities.
+
+    Every tenth plan has expired and every fifteenth is commercial, so the
+    lookup has to filter some of them out.
+    """
+    return [
+        {
+            "label": f"{index:024x}",
+            "uri": f"https://openei.org/apps/IURDB/rate/view/{index:024x}",
+            "name": f"Residential Plan {index}",
+            "utility": f"Utility {index % utilities}",
+            "eiaid": index % utilities,
+            "sector": "Commercial" if index % 15 == 0 else "Residential",
+            "startdate": 1341126000 + index,
+            "approved": bool(index % 2),
+            "country": "USA",
+        }
+        | ({"enddate": 1462172400} if index % 10 == 0 else {})
+        for index in range(plans)
+    ]
@@ -0,0 +1,168 @@
+"""Benchmarks for the refresh path, schedule evaluation and entity writes.
+
+The suite runs once as ordinary tests with ``--benchmark-disable`` and is
+timed by the tox ``benchmark`` environment.
+"""
+
+import json
+import re
+from datetime import datetime
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.openei.const import BINARY_SENSORS, DOMAIN, SENSOR_TYPES
+from custom_components.openei.schedule import RateSchedule
+from tests.common import load_fixture, run_sync
+from tests.const import CONFIG_DATA_WITH_SENSOR
+
+pytestmark = pytest.mark.asyncio
+
+TEST_PATTERN = r"^https://api\.openei\.org/utility_rates\?.*$"
+
+PLAN = json.loads(load_fixture("plan_data.json"))["items"][0]
+
+
+def _synthetic_plan(periods: int, tiers: int) -> dict:
+    """Return a plan with many rate periods, each with many usage tiers."""
+    structure = [
+        [
+            {"max": (tier + 1) * 50, "rate": 0.1 + period * 0.01 + tier * 0.002}
+            | ({"adj": 0.001 * tier} if tier % 2 else {})
+            for tier in range(tiers - 1)
+        ]
+        + [{"rate": 0.5 + period * 0.01, "adj": 0.01, "sell": 0.03}]
+        for period in range(periods)
+    ]
+    return {
+        **PLAN,
+        "energyratestructure": structure,
+        "energyweekdayschedule": [
+            [(month * 7 + hour) % periods for hour in range(24)] for month in range(12)
+        ],
+        "energyweekendschedule": [
+            [(month * 5 + hour // 3) % periods for hour in range(24)]
+            for month in range(12)
+        ],
+    }
+
+
+LARGE_PLAN = _synthetic_plan(periods=24, tiers=12)
+
+SCHEDULE_DATES = [
+    datetime(2024, month, 3 + month, month * 7 % 24) for month in range(1, 13)
+]
+
+
+async def _setup_entries(hass, mock_aioclient, count: int) -> list:
+    """Set up entries for distinct plans, all served the large plan."""
+    mock_aioclient.get(
+        re.compile(TEST_PATTERN),
+        status=200,
+        text=json.dumps({"items": [LARGE_PLAN]}),
+    )
+    hass.states.async_set("sensor.fakesensor", "275")
+
+    entries = []
+    for index in range(count):
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            title=f"Fake Utility Co {index}",
+            data={**CONFIG_DATA_WITH_SENSOR, "manual_plan": f"plan{index}"},
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        entries.append(entry)
+    await hass.async_block_till_done()
+    return entries
+
+
+@pytest.mark.parametrize(("periods", "tiers"), [(4, 3), (24, 12), (48, 40)])
+async def test_compile_schedule(benchmark, periods, tiers):
+    """Benchmark compiling a plan into lookup tables."""
+    plan = _synthetic_plan(periods, tiers)
+
+    schedule = benchmark(RateSchedule, plan)
+
+    assert len(schedule.all_rates[0]) == periods
+
+
+@pytest.mark.parametrize("reading", [0.0, 275.0, 5000.0])
+async def test_evaluate_schedule(benchmark, reading):
+    """Benchmark the rate and tier lookups made for every meter update."""
+    schedule = RateSchedule(LARGE_PLAN)
+
+    def _evaluate():
+        for when in SCHEDULE_DATES:
+            schedule.rate(when, reading)
+            schedule.adjustment(when, reading)
+            schedule.tier_rate(when, reading)
+            schedule.sell_rate(when)
+
+    benchmark(_evaluate)
+
+
+async def test_next_change(benchmark):
+    """Benchmark the search for the next rate structure change."""
+    schedule = RateSchedule(LARGE_PLAN)
+
+    benchmark(lambda: [schedule.next_change(when) for when in SCHEDULE_DATES])
+
+
+async def test_get_sensors(hass, mock_aioclient, benchmark):
+    """Benchmark turning a held plan into sensor data."""
+    (entry,) = await _setup_entries(hass, mock_aioclient, 1)
+    coordinator = entry.runtime_data
+
+    data = benchmark(lambda: run_sync(coordinator._get_sensors()))
+
+    assert data.current_rate is not None
+    assert data.bill_to_date is not None
+    assert mock_aioclient.call_count == 1
+
+
+@pytest.mark.parametrize("entries", [1, 10, 50])
+async def test_refresh_entries(hass, mock_aioclient, benchmark, entries):
+    """Benchmark one refresh of every coordinator with the plans held."""
+    coordinators = [
+        entry.runtime_data
+        for entry in await _setup_entries(hass, mock_aioclient, entries)
+    ]
+
+    def _refresh():
+        for coordinator in coordinators:
+            run_sync(coordinator.async_refresh())
+
+    benchmark(_refresh)
+
+    assert all(coordinator.last_update_success for coordinator in coordinators)
+    assert mock_aioclient.call_count == entries
+
+
+async def test_state_write_fan_out(hass, mock_aioclient, benchmark):
+    """Benchmark every entity of an entry writing its state."""
+    (entry,) = await _setup_entries(hass, mock_aioclient, 1)
+    coordinator = entry.runtime_data
+    written = len(hass.states.async_all())
+
+    def _fan_out():
+        # Forget what was notified so no listener is skipped
+        coordinator._notified_success = None
+        coordinator.async_update_listeners()
+        coordinator.metadata.async_update_listeners()
+
+    skipped = coordinator.skipped_writes
+    benchmark(_fan_out)
+
+    assert coordinator.skipped_writes == skipped
+    # all_rates only appears as attributes, the meter is not one of ours
+    assert written == len(SENSOR_TYPES) - 1 + 2 + len(BINARY_SENSORS) + 1
+
+
+async def test_meter_update(hass, mock_aioclient, benchmark):
+    """Benchmark a meter reading re-evaluating tiers and accumulating cost."""
+    await _setup_entries(hass, mock_aioclient, 1)
+    readings = iter(range(300, 10**9, 7))
+
+    benchmark(lambda: hass.states.async_set("sensor.fakesensor", str(next(readings))))
+    await hass.async_block_till_done()
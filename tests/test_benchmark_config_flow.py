@@ -0,0 +1,235 @@
+"""Benchmarks for the config flow at large lookup and registry sizes."""
+
+import json
+import re
+from unittest.mock import patch
+
+import attr
+import openeihttp
+import pytest
+from homeassistant import config_entries
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from pytest_homeassistant_custom_component.common import mock_registry
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMockResponse,
+)
+
+from custom_components.openei.config_flow import (
+    DATA_LOOKUP_CACHE,
+    _get_entities,
+    _get_plan_list,
+    _get_schema_step_2,
+    _get_schema_step_3,
+    _get_utility_list,
+    _lookup_plans,
+)
+from custom_components.openei.const import DOMAIN, LOOKUP_MAX_PLANS
+from custom_components.openei.entity_index import EntityIndex
+from custom_components.openei.quota import ApiQuota
+from tests.common import run_sync, synthetic_lookup
+
+pytestmark = pytest.mark.asyncio
+
+TEST_PATTERN = r"^https://api\.openei\.org/utility_rates\?.*$"
+
+# (utilities, plans) for a small search and one at the 200 mile radius limit
+SCALES = [(50, 500), (3000, 30000)]
+REGISTRY_SIZE = 50000
+ROUNDS = 20
+
+USER_INPUT = {"api_key": "fakeAPIKey", "location": "", "radius": 200}
+
+
+def _mock_lookup(mock_aioclient, items: list[dict]) -> None:
+    """Serve the lookup items a page at a time, like the API does."""
+    pages: dict[tuple[int, int], str] = {}
+
+    async def _respond(method, url, data):
+        offset = int(url.query.get("offset", 0))
+        limit = int(url.query.get("limit", len(items)))
+        if (page := pages.get((offset, limit))) is None:
+            page = pages[offset, limit] = json.dumps(
+                {"items": items[offset : offset + limit]}
+            )
+        return AiohttpClientMockResponse(method, url, text=page)
+
+    mock_aioclient.get(re.compile(TEST_PATTERN), side_effect=_respond)
+
+
+def _mock_entities(hass, count: int) -> None:
+    """Fill the entity registry, every tenth entity an energy sensor."""
+    template = er.async_get(hass).async_get_or_create("sensor", "bench", "template")
+    domains = ("sensor", "binary_sensor", "switch", "light", "sensor")
+    entries = {}
+    for index in range(count):
+        domain = domains[index % len(domains)]
+        entity_id = f"{domain}.bench_{index}"
+        entries[entity_id] = attr.evolve(
+            template,
+            id=f"{index:032x}",
+            entity_id=entity_id,
+            unique_id=str(index),
+            original_device_class=(
+                "energy" if domain == "sensor" and index % 10 == 0 else None
+            ),
+        )
+    mock_registry(hass, entries)
+
+
+def _abort_flows(hass) -> None:
+    """Abort every config flow left in progress."""
+    for flow in hass.config_entries.flow.async_progress():
+        hass.config_entries.flow.async_abort(flow["flow_id"])
+
+
+async def _start_flow(hass) -> str:
+    """Start a user flow, loading the integration on first use."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    return result["flow_id"]
+
+
+async def test_entity_index_build(hass, benchmark):
+    """Benchmark indexing a large entity registry."""
+    _mock_entities(hass, REGISTRY_SIZE)
+
+    index = benchmark.pedantic(EntityIndex, args=(hass,), rounds=ROUNDS)
+
+    assert len(index.async_get("sensor", "energy")) == REGISTRY_SIZE // 10
+
+
+async def test_get_entities(hass, benchmark):
+    """Benchmark listing energy sensors from a large entity registry."""
+    _mock_entities(hass, REGISTRY_SIZE)
+
+    entities = benchmark(_get_entities, hass, "sensor", "energy", "(none)")
+
+    assert len(entities) == REGISTRY_SIZE // 10 + 1
+
+
+@pytest.mark.parametrize("bounded", [True, False], ids=["bounded", "unbounded"])
+@pytest.mark.parametrize(("utilities", "plans"), SCALES)
+async def test_lookup_plans(hass, mock_aioclient, benchmark, utilities, plans, bounded):
+    """Benchmark reading and filtering the paged lookup response."""
+    _mock_lookup(mock_aioclient, synthetic_lookup(utilities, plans))
+    handler = openeihttp.Rates(api="fakeAPIKey", session=async_get_clientsession(hass))
+    params = {"api_key": "fakeAPIKey", "lat": 32.87, "lon": -117.22, "radius": 200}
+    # Every round reads many pages, more than one hour's real budget
+    quota = ApiQuota(capacity=10**9)
+
+    with patch(
+        "custom_components.openei.config_flow.LOOKUP_MAX_PLANS",
+        LOOKUP_MAX_PLANS if bounded else plans,
+    ):
+        result = benchmark(lambda: run_sync(_lookup_plans(handler, params, quota)))
+
+    listed = sum(len(names) for names in result.values()) - 1
+    assert listed <= (min(plans, LOOKUP_MAX_PLANS) if bounded else plans)
+
+
+@pytest.mark.parametrize(("utilities", "plans"), SCALES)
+async def test_utility_schema(benchmark, utilities, plans):
+    """Benchmark building the utility list and its selector."""
+    lookup: dict[str, list[dict[str, str]]] = {}
+    for item in synthetic_lookup(utilities, plans):
+        lookup.setdefault(item["utility"], []).append(
+            {"name": item["name"], "label": item["label"]}
+        )
+
+    benchmark(lambda: _get_schema_step_2({}, {}, _get_utility_list(lookup)))
+
+
+@pytest.mark.parametrize(("utilities", "plans"), SCALES)
+async def test_plan_schema(hass, benchmark, utilities, plans):
+    """Benchmark building the plan and meter selectors on a large install."""
+    _mock_entities(hass, REGISTRY_SIZE)
+    lookup = {"Utility 1": []}
+    for item in synthetic_lookup(utilities, plans):
+        lookup.setdefault(item["utility"], []).append(
+            {"name": item["name"], "label": item["label"]}
+        )
+    user_input = {**USER_INPUT, "utility": "Utility 1"}
+
+    benchmark(
+        lambda: _get_schema_step_3(
+            hass, user_input, {}, _get_plan_list(lookup, user_input)
+        )
+    )
+
+
+async def test_flow_step_user(hass, benchmark):
+    """Benchmark showing the first form."""
+    _abort_flows(hass)
+    await _start_flow(hass)
+
+    result = benchmark.pedantic(
+        lambda: run_sync(
+            hass.config_entries.flow.async_init(
+                DOMAIN, context={"source": config_entries.SOURCE_USER}
+            )
+        ),
+        setup=lambda: _abort_flows(hass),
+        rounds=ROUNDS,
+    )
+
+    assert result["step_id"] == "user"
+    _abort_flows(hass)
+
+
+@pytest.mark.parametrize(("utilities", "plans"), SCALES)
+async def test_flow_step_utility(hass, mock_aioclient, benchmark, utilities, plans):
+    """Benchmark submitting the location, including the lookup it starts."""
+    _mock_lookup(mock_aioclient, synthetic_lookup(utilities, plans))
+    await _start_flow(hass)
+
+    def _setup():
+        _abort_flows(hass)
+        hass.data.pop(DATA_LOOKUP_CACHE, None)
+        flow_id = run_sync(
+            hass.config_entries.flow.async_init(
+                DOMAIN, context={"source": config_entries.SOURCE_USER}
+            )
+        )["flow_id"]
+        return (flow_id,), {}
+
+    result = benchmark.pedantic(
+        lambda flow_id: run_sync(
+            hass.config_entries.flow.async_configure(flow_id, dict(USER_INPUT))
+        ),
+        setup=_setup,
+        rounds=ROUNDS,
+    )
+
+    assert result["step_id"] == "user_2"
+    _abort_flows(hass)
+
+
+@pytest.mark.parametrize(("utilities", "plans"), SCALES)
+async def test_flow_step_plan(hass, mock_aioclient, benchmark, utilities, plans):
+    """Benchmark choosing a utility on an install with a large registry."""
+    _mock_lookup(mock_aioclient, synthetic_lookup(utilities, plans))
+    _mock_entities(hass, REGISTRY_SIZE)
+    await _start_flow(hass)
+
+    def _setup():
+        _abort_flows(hass)
+        flow_id = run_sync(
+            hass.config_entries.flow.async_init(
+                DOMAIN, context={"source": config_entries.SOURCE_USER}
+            )
+        )["flow_id"]
+        run_sync(hass.config_entries.flow.async_configure(flow_id, dict(USER_INPUT)))
+        return (flow_id,), {}
+
+    result = benchmark.pedantic(
+        lambda flow_id: run_sync(
+            hass.config_entries.flow.async_configure(flow_id, {"utility": "Utility 1"})
+        ),
+        setup=_setup,
+        rounds=ROUNDS,
+    )
+
+    assert result["step_id"] == "user_3"
+    _abort_flows(hass)
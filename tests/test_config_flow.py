@@ -1,14 +1,20 @@
 """Test OpenEI config flow."""
 
+import asyncio
+import json
 import re
 from unittest.mock import patch
 
+import openeihttp
 import pytest
 from homeassistant import config_entries, setup
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResultType
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
-from custom_components.openei.const import DOMAIN
+from custom_components.openei.config_flow import DATA_LOOKUP_CACHE
+from custom_components.openei.const import API_HOURLY_QUOTA, DOMAIN
+from custom_components.openei.quota import ApiQuota, QuotaExceeded
 from tests.common import load_fixture
 from tests.const import CONFIG_DATA
 
@@ -258,6 +264,31 @@ async def test_get_entities_helper(hass):
     assert len(result) == 2
 
 
+async def test_get_entities_follows_registry(hass):
+    """Test the entity index follows entity registry changes."""
+    from homeassistant.helpers import entity_registry as er
+
+    from custom_components.openei.config_flow import _get_entities
+
+    registry = er.async_get(hass)
+    assert _get_entities(hass, "sensor", search="energy") == []
+
+    entry = registry.async_get_or_create(
+        "sensor", "test", "usage", original_device_class="water"
+    )
+    assert _get_entities(hass, "sensor", search="energy") == []
+
+    registry.async_update_entity(entry.entity_id, device_class="energy")
+    assert _get_entities(hass, "sensor", search="energy") == [entry.entity_id]
+
+    registry.async_update_entity(entry.entity_id, new_entity_id="sensor.meter")
+    assert _get_entities(hass, "sensor", search="energy") == ["sensor.meter"]
+    assert _get_entities(hass, "sensor", search="water") == ["sensor.meter"]
+
+    registry.async_remove("sensor.meter")
+    assert _get_entities(hass, "sensor") == []
+
+
 async def test_get_schema_step_1():
     """Test _get_schema_step_1."""
     from custom_components.openei.config_flow import _get_schema_step_1
@@ -298,13 +329,373 @@ async def test_get_schema_step_3(hass):
 
 
 async def test_lookup_plans():
-    """Test _lookup_plans."""
+    """Test _lookup_plans pages through results and drops stale plans."""
     from custom_components.openei.config_flow import _lookup_plans
 
+    items = [
+        {key: value for key, value in item.items() if key != "enddate"}
+        for item in json.loads(load_fixture("lookup.json"))["items"]
+    ]
+    items[0] = {**items[0], "sector": "Commercial"}
+    items[1] = {**items[1], "enddate": 1}
+    pages = [items[:20], items[20:]]
+    requests = []
+
     class MockHandler:
-        async def lookup_plans(self):
-            return {"Utility": [{"name": "Plan", "label": "label"}]}
+        async def process_request(self, params):
+            requests.append(params)
+            return {"items": pages[params["offset"] // 20]}
+
+    quota = ApiQuota()
+    with patch("custom_components.openei.config_flow.LOOKUP_PAGE_SIZE", 20):
+        result = await _lookup_plans(MockHandler(), {"api_key": "fakeAPIKey"}, quota)
+
+    assert [params["offset"] for params in requests] == [0, 20]
+    assert quota.remaining == API_HOURLY_QUOTA - 2
+    assert all(params["detail"] == "minimal" for params in requests)
+    labels = {plan["label"] for plans in result.values() for plan in plans}
+    assert items[0]["label"] not in labels
+    assert items[1]["label"] not in labels
+    assert items[2]["label"] in labels
+    assert result["Not Listed"] == [{"name": "Not Listed", "label": "Not Listed"}]
+
+
+async def test_lookup_plans_limit(caplog):
+    """Test _lookup_plans warns when it stops before the last plan."""
+    from custom_components.openei.config_flow import _lookup_plans
+
+    items = json.loads(load_fixture("lookup.json"))["items"][:20]
+    requests = []
+
+    class MockHandler:
+        async def process_request(self, params):
+            requests.append(params)
+            return {"items": items}
+
+    with (
+        patch("custom_components.openei.config_flow.LOOKUP_PAGE_SIZE", 20),
+        patch("custom_components.openei.config_flow.LOOKUP_MAX_PLANS", 60),
+    ):
+        await _lookup_plans(MockHandler(), {"api_key": "fakeAPIKey"}, ApiQuota())
+
+    assert len(requests) == 3
+    assert all(params["direction"] == "desc" for params in requests)
+    assert "Plan lookup stopped after the newest 60 plans" in caplog.text
+
+
+async def test_lookup_plans_rate_limit():
+    """Test a rate limit reply to a lookup starts the backoff."""
+    from custom_components.openei.config_flow import _lookup_plans
+
+    class MockHandler:
+        async def process_request(self, params):
+            return {
+                "error": {
+                    "code": "OVER_RATE_LIMIT",
+                    "message": "You have exceeded your rate limit. Try again later.",
+                }
+            }
+
+    quota = ApiQuota()
+    with pytest.raises(openeihttp.RateLimit):
+        await _lookup_plans(MockHandler(), {"api_key": "fakeAPIKey"}, quota)
+
+    assert quota.backoff_until is not None
+    with pytest.raises(QuotaExceeded):
+        await _lookup_plans(MockHandler(), {"api_key": "fakeAPIKey"}, quota)
+
+
+async def test_options_flow(hass):
+    """Test the options flow."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Fake Utility Co",
+        data=CONFIG_DATA,
+    )
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "init"
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {"revision_interval": 6}
+    )
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert entry.options == {"revision_interval": 6}
+
+
+async def test_lookup_shared_between_steps_and_flows(hass):
+    """Test one lookup serves both steps and a following flow."""
+    user_input = {"api_key": "fakeAPIKey", "radius": 0, "location": ""}
+
+    with (
+        patch(
+            "custom_components.openei.async_setup_entry",
+            return_value=True,
+        ),
+        patch(
+            "custom_components.openei.config_flow._lookup_plans",
+            return_value={
+                "Fake Utility Co": [{"name": "Fake Plan Name", "label": "randomstring"}]
+            },
+        ) as mock_lookup,
+        patch(
+            "custom_components.openei.config_flow._get_entities",
+            return_value=["(none)"],
+        ),
+    ):
+        for _ in range(2):
+            result = await hass.config_entries.flow.async_init(
+                DOMAIN, context={"source": config_entries.SOURCE_USER}
+            )
+            result = await hass.config_entries.flow.async_configure(
+                result["flow_id"], user_input
+            )
+            assert result["step_id"] == "user_2"
+            result = await hass.config_entries.flow.async_configure(
+                result["flow_id"], {"utility": "Fake Utility Co"}
+            )
+            assert result["step_id"] == "user_3"
+            result = await hass.config_entries.flow.async_configure(
+                result["flow_id"],
+                {"rate_plan": "randomstring", "sensor": "(none)", "manual_plan": ""},
+            )
+            assert result["type"] == "create_entry"
+
+        assert mock_lookup.call_count == 1
+
+        # A different location is looked up again
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN, context={"source": config_entries.SOURCE_USER}
+        )
+        await hass.config_entries.flow.async_configure(
+            result["flow_id"], {**user_input, "location": "85001"}
+        )
+        assert mock_lookup.call_count == 2
+
+
+@pytest.mark.parametrize(
+    ("exception", "error"),
+    [
+        (QuotaExceeded("No API requests left this hour"), "quota_exceeded"),
+        (openeihttp.RateLimit, "rate_limited"),
+        (openeihttp.NotAuthorized, "invalid_auth"),
+        (openeihttp.APIError, "lookup_failed"),
+    ],
+)
+async def test_lookup_fails(hass, exception, error):
+    """Test a failed lookup returns to the first step and is retried."""
+    user_input = {"api_key": "fakeAPIKey", "radius": 0, "location": ""}
+
+    with patch(
+        "custom_components.openei.config_flow._lookup_plans",
+        side_effect=[
+            exception,
+            {"Fake Utility Co": [{"name": "Fake Plan Name", "label": "plan"}]},
+        ],
+    ) as mock_lookup:
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN, context={"source": config_entries.SOURCE_USER}
+        )
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], user_input
+        )
+
+        assert result["type"] is FlowResultType.FORM
+        assert result["step_id"] == "user"
+        assert result["errors"] == {"base": error}
+
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], user_input
+        )
+
+    assert result["step_id"] == "user_2"
+    assert mock_lookup.call_count == 2
+    hass.config_entries.flow.async_abort(result["flow_id"])
+
+
+async def test_form_does_not_look_up(hass):
+    """Test showing the first step makes no request and offers no API key."""
+    MockConfigEntry(
+        domain=DOMAIN, title="Fake Utility Co", data=CONFIG_DATA
+    ).add_to_hass(hass)
+
+    with patch("custom_components.openei.config_flow._lookup_plans") as mock_lookup:
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN, context={"source": config_entries.SOURCE_USER}
+        )
+        await hass.async_block_till_done()
+
+    assert result["step_id"] == "user"
+    assert mock_lookup.call_count == 0
+    schema = result["data_schema"].schema
+    api_key = next(key for key in schema if key == "api_key")
+    assert api_key.default() is None
+    hass.config_entries.flow.async_abort(result["flow_id"])
+
+
+async def _reconfigure_to(hass, entry, plan):
+    """Run the reconfigure flow and pick a new plan."""
+    with (
+        patch(
+            "custom_components.openei.config_flow._lookup_plans",
+            return_value={
+                "Fake Utility Co": [{"name": "Fake Plan Name", "label": plan}]
+            },
+        ),
+        patch(
+            "custom_components.openei.config_flow._get_entities",
+            return_value=["(none)"],
+        ),
+    ):
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN,
+            context={
+                "source": config_entries.SOURCE_RECONFIGURE,
+                "entry_id": entry.entry_id,
+            },
+        )
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {"api_key": "fakeAPIKey", "radius": 0, "location": ""}
+        )
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {"utility": "Fake Utility Co"}
+        )
+        return await hass.config_entries.flow.async_configure(
+            result["flow_id"],
+            {"rate_plan": plan, "sensor": "(none)", "manual_plan": ""},
+        )
+
+
+async def test_reconfigure_in_place(hass, mock_aioclient):
+    """Test reconfiguring swaps the plan on the running coordinator."""
+    mock_aioclient.get(
+        re.compile(TEST_PATTERN),
+        status=200,
+        text=load_fixture("plan_data.json"),
+    )
+    entry = MockConfigEntry(domain=DOMAIN, title="Fake Utility Co", data=CONFIG_DATA)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = entry.runtime_data
+
+    unavailable = []
+
+    @callback
+    def _state_changed(event):
+        new_state = event.data["new_state"]
+        if new_state is None or new_state.state == "unavailable":
+            unavailable.append(event.data["entity_id"])
+
+    hass.bus.async_listen("state_changed", _state_changed)
+
+    result = await _reconfigure_to(hass, entry, "newplan")
+    await hass.async_block_till_done()
+
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "reconfigure_successful"
+    assert entry.runtime_data is coordinator
+    assert coordinator.plan_key == ("fakeAPIKey", "newplan")
+    assert coordinator.schedule is not None
+    assert mock_aioclient.call_count == 2
+    assert unavailable == []
+
+
+async def test_reconfigure_prefetch_fails(hass, mock_aioclient):
+    """Test the entry is left unchanged if the new plan cannot be fetched."""
+    mock_aioclient.get(
+        re.compile(TEST_PATTERN),
+        status=200,
+        text=load_fixture("plan_data.json"),
+    )
+    entry = MockConfigEntry(domain=DOMAIN, title="Fake Utility Co", data=CONFIG_DATA)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    mock_aioclient.clear_requests()
+    mock_aioclient.get(re.compile(TEST_PATTERN), status=500, text="error")
+    result = await _reconfigure_to(hass, entry, "newplan")
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {"base": "cannot_connect"}
+    assert entry.data == CONFIG_DATA
+    assert entry.runtime_data.plan_key == ("fakeAPIKey", "manualfakerateplan")
+
+    mock_aioclient.clear_requests()
+    mock_aioclient.get(re.compile(TEST_PATTERN), status=401, text="{}")
+    result = await _reconfigure_to(hass, entry, "newplan")
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {"base": "invalid_auth"}
+    assert entry.data == CONFIG_DATA
+
+
+async def test_lookup_started_speculatively(hass, mock_api):
+    """Test the lookup starts with the form and is cancelled on new inputs."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Fake Utility Co",
+        data={**CONFIG_DATA, "location": "", "radius": 0},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    release = asyncio.Event()
+    calls = []
+    cancelled = []
+
+    async def _lookup(handler, params, quota):
+        calls.append(params["api_key"])
+        try:
+            await release.wait()
+        except asyncio.CancelledError:
+            cancelled.append(params["api_key"])
+            raise
+        return {"Fake Utility Co": [{"name": "Fake Plan", "label": "plan"}]}
+
+    with patch("custom_components.openei.config_flow._lookup_plans", _lookup):
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN,
+            context={
+                "source": config_entries.SOURCE_RECONFIGURE,
+                "entry_id": entry.entry_id,
+            },
+        )
+        await asyncio.sleep(0)
+        assert calls == ["fakeAPIKey"]
+
+        release.set()
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {"api_key": "fakeAPIKey", "radius": 0, "location": ""}
+        )
+        assert result["step_id"] == "reconfig_2"
+        assert calls == ["fakeAPIKey"]
+        hass.config_entries.flow.async_abort(result["flow_id"])
+
+        # A lookup for inputs that are then changed is dropped
+        release.clear()
+        hass.data.pop(DATA_LOOKUP_CACHE)
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN,
+            context={
+                "source": config_entries.SOURCE_RECONFIGURE,
+                "entry_id": entry.entry_id,
+            },
+        )
+        await asyncio.sleep(0)
+        configure = hass.async_create_task(
+            hass.config_entries.flow.async_configure(
+                result["flow_id"],
+                {"api_key": "otherAPIKey", "radius": 0, "location": ""},
+            )
+        )
+        await asyncio.sleep(0)
+        release.set()
+        result = await configure
 
-    handler = MockHandler()
-    result = await _lookup_plans(handler)
-    assert result == {"Utility": [{"name": "Plan", "label": "label"}]}
+    assert result["step_id"] == "reconfig_2"
+    assert cancelled == ["fakeAPIKey"]
@@ -0,0 +1,81 @@
+"""Tests for the energy cost accumulator."""
+
+import logging
+from datetime import datetime
+
+import pytest
+
+from custom_components.openei.cost import CostAccumulator
+
+
+def test_accumulates_deltas():
+    """Test readings are charged at the given price."""
+    cost = CostAccumulator()
+
+    assert not cost.add(datetime(2024, 6, 3, 10), 100.0, 0.1)
+    assert cost.add(datetime(2024, 6, 3, 11), 105.0, 0.1)
+    assert cost.add(datetime(2024, 6, 3, 12), 107.0, 0.5)
+    assert not cost.add(datetime(2024, 6, 3, 13), 107.0, 0.5)
+    assert cost.today == pytest.approx(1.5)
+    assert cost.billing == pytest.approx(1.5)
+
+    # A meter reset counts everything shown since
+    assert cost.add(datetime(2024, 6, 3, 14), 2.0, 0.5)
+    assert cost.today == pytest.approx(2.5)
+
+
+def test_resets_at_boundaries():
+    """Test totals reset at day and billing cycle boundaries."""
+    cost = CostAccumulator()
+    cost.add(datetime(2024, 6, 29, 23), 0.0, 0.1)
+    cost.add(datetime(2024, 6, 29, 23, 30), 10.0, 0.1)
+
+    assert cost.roll(datetime(2024, 6, 30, 0))
+    assert cost.today == 0.0
+    assert cost.billing == pytest.approx(1.0)
+
+    cost.add(datetime(2024, 6, 30, 1), 20.0, 0.1)
+    assert cost.roll(datetime(2024, 7, 1, 0))
+    assert cost.today == cost.billing == 0.0
+    assert cost.period == (2024, 7)
+
+
+def test_bill_charges():
+    """Test fixed and minimum charges are applied to the bill."""
+    cost = CostAccumulator()
+    cost.add(datetime(2024, 6, 10, 1), 0.0, 0.1)
+    cost.add(datetime(2024, 6, 10, 2), 50.0, 0.1)
+    now = datetime(2024, 6, 10, 3)
+
+    assert cost.bill(now, None, None) == pytest.approx(5.0)
+    assert cost.bill(now, (16.91, "$/month"), None) == pytest.approx(21.91)
+    assert cost.bill(now, (0.5, "$/day"), None) == pytest.approx(10.0)
+    assert cost.bill(now, None, (30.0, "$/month")) == 30.0
+    assert cost.bill(now, (1.0, "$/meter"), (None, "$/month")) == pytest.approx(5.0)
+
+
+def test_bill_yearly_charges(caplog):
+    """Test yearly charges are spread over the months and other units logged."""
+    cost = CostAccumulator()
+    now = datetime(2024, 6, 10, 3)
+
+    assert cost.bill(now, (120.0, "$/year"), None) == pytest.approx(10.0)
+    assert cost.bill(now, None, (360.0, "$/year")) == pytest.approx(30.0)
+
+    with caplog.at_level(logging.WARNING):
+        assert cost.bill(now, (5.0, "$/quarter"), None) == 0.0
+        assert cost.bill(now, (5.0, "$/quarter"), None) == 0.0
+    assert caplog.text.count("$/quarter are not supported") == 1
+
+
+def test_restore():
+    """Test the state round trips through storage."""
+    cost = CostAccumulator()
+    cost.add(datetime(2024, 6, 10, 1), 0.0, 0.1)
+    cost.add(datetime(2024, 6, 10, 2), 50.0, 0.1)
+
+    restored = CostAccumulator()
+    restored.restore(cost.as_dict())
+
+    assert restored.as_dict() == cost.as_dict()
+    assert restored.period == (2024, 6)
@@ -0,0 +1,115 @@
+"""Tests for OpenEI diagnostics."""
+
+import pytest
+from homeassistant.components.diagnostics import REDACTED
+from homeassistant.helpers import entity_registry as er
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.openei.const import DIAGNOSTIC_SENSOR_TYPES, DOMAIN
+from custom_components.openei.diagnostics import async_get_config_entry_diagnostics
+from tests.const import CONFIG_DATA
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_entry_diagnostics(hass, mock_api):
+    """Test diagnostics report refresh stats without the API key."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Fake Utility Co",
+        data=CONFIG_DATA,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["entry"]["data"]["api_key"] == REDACTED
+    assert CONFIG_DATA["api_key"] not in str(diagnostics)
+    assert diagnostics["plan"]["label"] == CONFIG_DATA["manual_plan"]
+    assert diagnostics["refresh"]["cache_misses"] == 1
+    assert diagnostics["refresh"]["fetch_latency"] is not None
+    assert diagnostics["refresh"]["response_bytes"] > 0
+    assert diagnostics["quota"]["remaining"] < 1000
+    assert diagnostics["data"]["current_rate"] is not None
+    assert diagnostics["metadata"]["approval"] is True
+
+
+async def test_diagnostic_sensors_disabled(hass, mock_api):
+    """Test the refresh stats sensors are created disabled."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Fake Utility Co",
+        data=CONFIG_DATA,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    registry = er.async_get(hass)
+    for key in DIAGNOSTIC_SENSOR_TYPES:
+        entity_id = registry.async_get_entity_id(
+            "sensor", DOMAIN, f"{key}_{entry.entry_id}"
+        )
+        assert registry.async_get(entity_id).disabled_by is (
+            er.RegistryEntryDisabler.INTEGRATION
+        )
+
+
+async def test_diagnostic_sensor_enabled(hass, mock_api):
+    """Test an enabled refresh stats sensor follows the counters."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Fake Utility Co",
+        data=CONFIG_DATA,
+    )
+    entry.add_to_hass(hass)
+    registry = er.async_get(hass)
+    registry.async_get_or_create(
+        "sensor",
+        DOMAIN,
+        f"cache_hits_{entry.entry_id}",
+        suggested_object_id="openei_cache_hits",
+    )
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.openei_cache_hits").state == "0"
+
+    await entry.runtime_data.async_refresh()
+    await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.openei_cache_hits").state == "1"
+
+
+async def test_update_diagnostic_sensor(hass, mock_api):
+    """Test updating a refresh stats sensor keeps the stats available."""
+    assert await async_setup_component(hass, "homeassistant", {})
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Fake Utility Co",
+        data=CONFIG_DATA,
+    )
+    entry.add_to_hass(hass)
+    er.async_get(hass).async_get_or_create(
+        "sensor",
+        DOMAIN,
+        f"fetch_latency_{entry.entry_id}",
+        suggested_object_id="openei_fetch_latency",
+    )
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    state = hass.states.get("sensor.openei_fetch_latency").state
+
+    await hass.services.async_call(
+        "homeassistant",
+        "update_entity",
+        {"entity_id": "sensor.openei_fetch_latency"},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+    assert entry.runtime_data.stats.last_update_success
+    assert hass.states.get("sensor.openei_fetch_latency").state == state
+    assert state != "unavailable"
@@ -1,16 +1,30 @@
 """Tests for init."""
 
+import json
 import logging
+import os
 import re
+from dataclasses import FrozenInstanceError
+from datetime import timedelta
 from unittest.mock import patch
 
 import pytest
 from homeassistant.components.binary_sensor import DOMAIN as BINARY_SENSOR_DOMAIN
 from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
+from homeassistant.core import State
+from homeassistant.helpers import entity_registry as er
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
 from openeihttp import APIError, NotAuthorized
-from pytest_homeassistant_custom_component.common import MockConfigEntry
-
-from custom_components.openei.const import DOMAIN
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+    mock_restore_cache_with_extra_data,
+)
+
+from custom_components.openei import entry_offset
+from custom_components.openei.const import DOMAIN, STORAGE_KEY, STORAGE_SAVE_DELAY
+from custom_components.openei.plan_store import async_get_plan_store
 from tests.common import load_fixture
 from tests.const import CONFIG_DATA, CONFIG_DATA_MISSING_PLAN, CONFIG_DATA_WITH_SENSOR
 
@@ -36,7 +50,7 @@ async def test_setup_entry(hass, mock_aioclient, caplog):
         await hass.config_entries.async_setup(entry.entry_id)
         await hass.async_block_till_done()
 
-        assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 11
+        assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 12
         assert len(hass.states.async_entity_ids(BINARY_SENSOR_DOMAIN)) == 1
         entries = hass.config_entries.async_entries(DOMAIN)
         assert len(entries) == 1
@@ -54,14 +68,14 @@ async def test_unload_entry(hass, mock_api):
     assert await hass.config_entries.async_setup(entry.entry_id)
     await hass.async_block_till_done()
 
-    assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 11
+    assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 12
     assert len(hass.states.async_entity_ids(BINARY_SENSOR_DOMAIN)) == 1
     entries = hass.config_entries.async_entries(DOMAIN)
     assert len(entries) == 1
 
     assert await hass.config_entries.async_unload(entries[0].entry_id)
     await hass.async_block_till_done()
-    assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 11
+    assert len(hass.states.async_entity_ids(SENSOR_DOMAIN)) == 12
     assert len(hass.states.async_entity_ids(BINARY_SENSOR_DOMAIN)) == 1
     assert len(hass.states.async_entity_ids(DOMAIN)) == 0
 
@@ -79,7 +93,7 @@ async def test_setup_api_error(hass):
     )
 
     entry.add_to_hass(hass)
-    with patch("openeihttp.Rates.update", side_effect=APIError):
+    with patch("openeihttp.Rates.process_request", side_effect=APIError):
         await hass.config_entries.async_setup(entry.entry_id)
         await hass.async_block_till_done()
 
@@ -98,7 +112,7 @@ async def test_setup_not_authorized(hass, caplog):
     entry.add_to_hass(hass)
     with (
         caplog.at_level(logging.ERROR),
-        patch("openeihttp.Rates.update", side_effect=NotAuthorized),
+        patch("openeihttp.Rates.process_request", side_effect=NotAuthorized),
     ):
         await hass.config_entries.async_setup(entry.entry_id)
         await hass.async_block_till_done()
@@ -150,6 +164,11 @@ async def test_rate_limit_error(hass, mock_api_err, caplog):
     await hass.async_block_till_done()
     assert "API Rate limit exceeded, retrying later." in caplog.text
 
+    stats = entry.runtime_data.stats.data
+    assert stats.rate_limit_events == 1
+    assert stats.consecutive_failures == 1
+    assert stats.fetch_latency is None
+
 
 async def test_setup_assertion_error(hass, caplog):
     """Test setting up entities with an AssertionError."""
@@ -162,7 +181,9 @@ async def test_setup_assertion_error(hass, caplog):
     entry.add_to_hass(hass)
     with (
         caplog.at_level(logging.DEBUG),
-        patch("openeihttp.Rates.update", side_effect=AssertionError("Mock error")),
+        patch(
+            "openeihttp.Rates.process_request", side_effect=AssertionError("Mock error")
+        ),
     ):
         await hass.config_entries.async_setup(entry.entry_id)
         await hass.async_block_till_done()
@@ -181,7 +202,9 @@ async def test_setup_exception_error(hass, caplog):
     entry.add_to_hass(hass)
     with (
         caplog.at_level(logging.DEBUG),
-        patch("openeihttp.Rates.update", side_effect=Exception("Mock exception")),
+        patch(
+            "openeihttp.Rates.process_request", side_effect=Exception("Mock exception")
+        ),
     ):
         await hass.config_entries.async_setup(entry.entry_id)
         await hass.async_block_till_done()
@@ -243,3 +266,535 @@ async def test_setup_entry_no_all_rates(hass, mock_api, caplog):
     ):
         await hass.config_entries.async_setup(entry.entry_id)
         await hass.async_block_till_done()
+
+
+async def test_refresh_uses_compiled_schedule(hass, mock_api, mock_aioclient):
+    """Test refreshing after setup does not call the API again."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Fake Utility Co",
+        data=CONFIG_DATA,
+    )
+
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert mock_aioclient.call_count == 1
+
+    coordinator = entry.runtime_data
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+
+    assert mock_aioclient.call_count == 1
+    assert coordinator.metadata.data.rate_name == (
+        "Residential Service TOU Time Advantage 7PM-Noon (ET-2)"
+    )
+    assert coordinator.metadata.data.fixedchargefirstmeter == 16.91
+
+    stats = coordinator.stats.data
+    assert (stats.cache_hits, stats.cache_misses) == (2, 1)
+    assert stats.consecutive_failures == 0
+    assert stats.response_bytes > 0
+    assert stats.transform_time is not None
+    assert stats.next_refresh > dt_util.utcnow()
+
+
+async def test_rate_structure_boundary(hass, mock_api, mock_aioclient, freezer):
+    """Test states are pushed when the rate structure changes."""
+    freezer.move_to("2024-06-03 10:30:00-07:00")
+    await hass.config.async_set_time_zone("America/Phoenix")
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Fake Utility Co",
+        data=CONFIG_DATA,
+    )
+
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = entry.runtime_data
+    next_time = coordinator.data.next_energy_rate_structure_time
+    next_structure = coordinator.data.next_energy_rate_structure
+    assert next_time.isoformat() == "2024-06-03T12:00:00-07:00"
+
+    freezer.move_to(next_time)
+    async_fire_time_changed(hass, next_time)
+    await hass.async_block_till_done()
+
+    assert coordinator.data.current_energy_rate_structure == next_structure
+    assert coordinator.data.next_energy_rate_structure_time > next_time
+    assert mock_aioclient.call_count == 1
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    assert coordinator._unsub_boundary is None
+
+
+async def test_revision_check(hass, mock_api, mock_aioclient, freezer):
+    """Test the plan is fetched again only after the revision interval."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Fake Utility Co",
+        data=CONFIG_DATA,
+        options={"revision_interval": 12},
+    )
+
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = entry.runtime_data
+    schedule = coordinator._schedule
+
+    freezer.tick(timedelta(hours=11))
+    await coordinator.async_refresh()
+    assert mock_aioclient.call_count == 1
+
+    freezer.tick(timedelta(hours=1))
+    await coordinator.async_refresh()
+    assert mock_aioclient.call_count == 2
+    # Same revision, the compiled plan is kept
+    assert coordinator._schedule is schedule
+
+
+async def test_revision_check_failure(hass, mock_aioclient, freezer, caplog):
+    """Test a failed revision check keeps pricing from the held plan."""
+    mock_aioclient.get(
+        re.compile(TEST_PATTERN), status=200, text=load_fixture("plan_data.json")
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Fake Utility Co",
+        data=CONFIG_DATA,
+        options={"revision_interval": 1},
+    )
+
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = entry.runtime_data
+    schedule = coordinator._schedule
+    rate = coordinator.data.current_rate
+
+    mock_aioclient.clear_requests()
+    mock_aioclient.get(re.compile(TEST_PATTERN), exc=TimeoutError())
+    freezer.tick(timedelta(hours=1))
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert mock_aioclient.call_count == 1
+    assert "using the held revision" in caplog.text
+    assert coordinator.last_update_success
+    assert coordinator._schedule is schedule
+    assert coordinator.data.current_rate == rate
+    assert coordinator.stats.data.consecutive_failures == 1
+    entity_id = er.async_get(hass).async_get_entity_id(
+        SENSOR_DOMAIN, DOMAIN, f"current_rate_{entry.entry_id}"
+    )
+    assert hass.states.get(entity_id).state == str(rate)
+
+    # The check is retried on the next refresh
+    mock_aioclient.clear_requests()
+    mock_aioclient.get(
+        re.compile(TEST_PATTERN), status=200, text=load_fixture("plan_data.json")
+    )
+    await coordinator.async_refresh()
+    assert mock_aioclient.call_count == 1
+    assert coordinator.stats.data.consecutive_failures == 0
+
+
+async def test_plan_expiry(hass, mock_aioclient, freezer):
+    """Test the plan is fetched again as soon as it expires."""
+    freezer.move_to("2024-06-03 10:30:00+00:00")
+    plan = json.loads(load_fixture("plan_data.json"))
+    plan["items"][0]["enddate"] = 1717416000  # 2024-06-03 12:00:00 UTC
+    mock_aioclient.get(re.compile(TEST_PATTERN), status=200, text=json.dumps(plan))
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Fake Utility Co",
+        data=CONFIG_DATA,
+    )
+
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert mock_aioclient.call_count == 1
+
+    freezer.move_to("2024-06-03 12:00:00+00:00")
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert mock_aioclient.call_count == 2
+
+
+async def test_meter_updates_tier(hass, mock_aioclient):
+    """Test meter changes re-evaluate tiers locally."""
+    plan = json.loads(load_fixture("plan_data.json"))
+    plan["items"][0]["energyratestructure"] = [
+        [{"max": 10, "rate": 0.1}, {"rate": 0.2}]
+    ] * 4
+    mock_aioclient.get(re.compile(TEST_PATTERN), status=200, text=json.dumps(plan))
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Fake Utility Co",
+        data=CONFIG_DATA_WITH_SENSOR,
+    )
+
+    hass.states.async_set("sensor.fakesensor", "5")
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    registry = er.async_get(hass)
+    rate_entity = registry.async_get_entity_id(
+        SENSOR_DOMAIN, DOMAIN, f"current_rate_{entry.entry_id}"
+    )
+    name_entity = registry.async_get_entity_id(
+        SENSOR_DOMAIN, DOMAIN, f"rate_name_{entry.entry_id}"
+    )
+    assert hass.states.get(rate_entity).state == "0.1"
+    name_updated = hass.states.get(name_entity).last_reported
+    snapshot = entry.runtime_data.data
+
+    hass.states.async_set("sensor.fakesensor", "15")
+    await hass.async_block_till_done()
+
+    assert hass.states.get(rate_entity).state == "0.2"
+    assert entry.runtime_data.data.monthly_tier_rate == 0.1
+    # Snapshots are replaced, never changed in place
+    assert snapshot.current_rate == 0.1
+    with pytest.raises(FrozenInstanceError):
+        snapshot.current_rate = 0.2
+    assert hass.states.get(name_entity).last_reported == name_updated
+    assert mock_aioclient.call_count == 1
+
+
+async def test_unchanged_states_not_written(hass, mock_api, freezer):
+    """Test refreshes only write entities whose data changed."""
+    freezer.move_to("2024-06-03 10:30:00-07:00")
+    await hass.config.async_set_time_zone("America/Phoenix")
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Fake Utility Co",
+        data=CONFIG_DATA,
+    )
+
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = entry.runtime_data
+    assert coordinator.skipped_writes == 0
+    name_entity = er.async_get(hass).async_get_entity_id(
+        SENSOR_DOMAIN, DOMAIN, f"rate_name_{entry.entry_id}"
+    )
+    name_reported = hass.states.get(name_entity).last_reported
+
+    await coordinator.async_refresh()
+    assert coordinator.skipped_writes == 8
+
+    # Only the structure sensors, the rates and the refilled API budget change
+    next_time = coordinator.data.next_energy_rate_structure_time
+    freezer.move_to(next_time)
+    async_fire_time_changed(hass, next_time)
+    await hass.async_block_till_done()
+    assert coordinator.skipped_writes == 8 + 2
+
+    # Plan metadata is a separate tier that local updates never touch
+    assert hass.states.get(name_entity).last_reported == name_reported
+
+
+async def test_cost_sensors(hass, mock_aioclient, freezer):
+    """Test meter readings accumulate into cost sensors."""
+    freezer.move_to("2024-06-03 10:30:00-07:00")
+    await hass.config.async_set_time_zone("America/Phoenix")
+    plan = json.loads(load_fixture("plan_data.json"))
+    plan["items"][0]["energyratestructure"] = [
+        [{"max": 10, "rate": 0.1}, {"rate": 0.2, "adj": 0.05}]
+    ] * 4
+    mock_aioclient.get(re.compile(TEST_PATTERN), status=200, text=json.dumps(plan))
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Fake Utility Co",
+        data=CONFIG_DATA_WITH_SENSOR,
+    )
+
+    hass.states.async_set("sensor.fakesensor", "5")
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    registry = er.async_get(hass)
+    today_entity = registry.async_get_entity_id(
+        SENSOR_DOMAIN, DOMAIN, f"energy_cost_today_{entry.entry_id}"
+    )
+    bill_entity = registry.async_get_entity_id(
+        SENSOR_DOMAIN, DOMAIN, f"bill_to_date_{entry.entry_id}"
+    )
+    assert hass.states.get(today_entity).state == "0.0"
+    assert hass.states.get(bill_entity).state == "16.91"
+
+    # Each delta is charged at the rate in effect before the reading
+    hass.states.async_set("sensor.fakesensor", "15")
+    await hass.async_block_till_done()
+    hass.states.async_set("sensor.fakesensor", "25")
+    await hass.async_block_till_done()
+
+    coordinator = entry.runtime_data
+    assert coordinator.data.energy_cost_today == pytest.approx(4.0)
+    assert coordinator.data.bill_to_date == pytest.approx(20.91)
+    state = hass.states.get(today_entity)
+    assert state.attributes["unit_of_measurement"] == hass.config.currency
+    assert state.attributes["last_reset"] == "2024-06-03T00:00:00-07:00"
+
+    # The day total resets at midnight, the billing cycle continues
+    midnight = dt_util.parse_datetime("2024-06-04 00:00:00-07:00")
+    freezer.move_to(midnight)
+    async_fire_time_changed(hass, midnight)
+    await hass.async_block_till_done()
+
+    assert hass.states.get(today_entity).state == "0.0"
+    assert coordinator.data.bill_to_date == pytest.approx(20.91)
+
+
+async def test_cost_restored(hass, mock_api, freezer):
+    """Test cost totals survive a restart."""
+    freezer.move_to("2024-06-03 10:30:00-07:00")
+    await hass.config.async_set_time_zone("America/Phoenix")
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Fake Utility Co",
+        data=CONFIG_DATA_WITH_SENSOR,
+    )
+    saved = {
+        "day": "2024-06-03",
+        "period": [2024, 6],
+        "today": 1.25,
+        "billing": 12.5,
+        "last_reading": 5.0,
+    }
+    registry = er.async_get(hass)
+    cache = []
+    for key in ("energy_cost_today", "bill_to_date"):
+        entity = registry.async_get_or_create(
+            SENSOR_DOMAIN, DOMAIN, f"{key}_{entry.entry_id}", suggested_object_id=key
+        )
+        cache.append((State(entity.entity_id, "0"), saved))
+    mock_restore_cache_with_extra_data(hass, cache)
+
+    hass.states.async_set("sensor.fakesensor", "5")
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = entry.runtime_data
+    assert coordinator.data.energy_cost_today == 1.25
+    assert coordinator.data.bill_to_date == pytest.approx(29.41)
+
+
+async def test_plan_persisted(hass, mock_api, hass_storage, freezer):
+    """Test downloaded plans are written to the store, not a cache file."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Fake Utility Co",
+        data=CONFIG_DATA,
+    )
+
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert STORAGE_KEY not in hass_storage
+    assert not os.path.exists(hass.config.path(".storage", f"openei_{entry.entry_id}"))
+
+    freezer.tick(timedelta(seconds=STORAGE_SAVE_DELAY))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    stored = hass_storage[STORAGE_KEY]["data"]["plans"]["manualfakerateplan"]
+    assert stored["plan"]["name"] == entry.runtime_data.metadata.data.rate_name
+
+    # Checking an unchanged revision does not write the store
+    del hass_storage[STORAGE_KEY]
+    await async_get_plan_store(hass).async_fetch(
+        entry.runtime_data.plan_key, force=True
+    )
+    freezer.tick(timedelta(seconds=STORAGE_SAVE_DELAY))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert STORAGE_KEY not in hass_storage
+
+    await hass.config_entries.async_remove(entry.entry_id)
+    freezer.tick(timedelta(seconds=STORAGE_SAVE_DELAY))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert hass_storage[STORAGE_KEY]["data"]["plans"] == {}
+
+
+async def test_startup_from_stored_plan(hass, mock_aioclient, hass_storage):
+    """Test entities come up from the stored plan without waiting for the API."""
+    plan = json.loads(load_fixture("plan_data.json"))["items"][0]
+    hass_storage[STORAGE_KEY] = {
+        "version": 1,
+        "key": STORAGE_KEY,
+        "data": {
+            "plans": {
+                "manualfakerateplan": {
+                    "fetched": dt_util.utcnow().isoformat(),
+                    "plan": plan,
+                }
+            }
+        },
+    }
+    mock_aioclient.get(re.compile(TEST_PATTERN), exc=TimeoutError)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Fake Utility Co",
+        data=CONFIG_DATA,
+    )
+
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert entry.runtime_data.metadata.data.rate_name == plan["name"]
+    assert mock_aioclient.call_count == 0
+    entity_id = er.async_get(hass).async_get_entity_id(
+        SENSOR_DOMAIN, DOMAIN, f"rate_name_{entry.entry_id}"
+    )
+    assert hass.states.get(entity_id).state == plan["name"]
+
+
+async def test_legacy_cache_imported(hass, mock_aioclient, hass_storage, tmp_path):
+    """Test a cache file from an older version is moved into the store."""
+    plan = json.loads(load_fixture("plan_data.json"))["items"][0]
+    hass.config.config_dir = str(tmp_path)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Fake Utility Co",
+        data=CONFIG_DATA,
+    )
+    cache_file = tmp_path / ".storage" / f"openei_{entry.entry_id}"
+    cache_file.parent.mkdir()
+    cache_file.write_text(json.dumps(plan))
+
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert entry.runtime_data.metadata.data.rate_name == plan["name"]
+    assert mock_aioclient.call_count == 0
+    assert not cache_file.exists()
+
+
+async def test_refresh_staggered(hass, mock_api):
+    """Test each entry refreshes at its own offset within the hour."""
+    entries = [
+        MockConfigEntry(domain=DOMAIN, title=f"Meter {idx}", data=CONFIG_DATA)
+        for idx in range(2)
+    ]
+    for entry in entries:
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    now = dt_util.utcnow().timestamp()
+    for entry in entries:
+        assert entry_offset(entry.entry_id) == entry_offset(entry.entry_id)
+        next_refresh = now + entry.runtime_data.update_interval.total_seconds()
+        assert next_refresh % 3600 == pytest.approx(
+            entry_offset(entry.entry_id) % 3600, abs=1
+        )
+
+
+async def test_revision_check_off_peak(hass, mock_api, mock_aioclient, freezer):
+    """Test daily revision checks wait for the entry's off-peak slot."""
+    freezer.move_to("2024-06-03 10:30:00-07:00")
+    await hass.config.async_set_time_zone("America/Phoenix")
+    entry = MockConfigEntry(domain=DOMAIN, title="Fake Utility Co", data=CONFIG_DATA)
+
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = entry.runtime_data
+
+    freezer.tick(timedelta(days=1))
+    await coordinator.async_refresh()
+    assert mock_aioclient.call_count == 1
+
+    slot = dt_util.parse_datetime("2024-06-05 01:00:00-07:00") + timedelta(
+        seconds=entry_offset(entry.entry_id) % (4 * 3600)
+    )
+    freezer.move_to(slot - timedelta(seconds=1))
+    await coordinator.async_refresh()
+    assert mock_aioclient.call_count == 1
+
+    freezer.move_to(slot)
+    await coordinator.async_refresh()
+    assert mock_aioclient.call_count == 2
+
+    # Hourly refreshes, landing just after the slot, check once a day
+    checks = []
+    freezer.tick(timedelta(seconds=1))
+    for _ in range(5 * 24):
+        freezer.tick(timedelta(hours=1))
+        calls = mock_aioclient.call_count
+        await coordinator.async_refresh()
+        if mock_aioclient.call_count > calls:
+            checks.append(dt_util.now())
+    assert checks == [slot + timedelta(days=day, seconds=1) for day in range(1, 6)]
+
+
+async def test_new_revision_updates_metadata(hass, mock_aioclient, freezer):
+    """Test plan metadata is refreshed when a new revision is fetched."""
+    plan = json.loads(load_fixture("plan_data.json"))
+    mock_aioclient.get(re.compile(TEST_PATTERN), status=200, text=json.dumps(plan))
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Fake Utility Co",
+        data=CONFIG_DATA,
+        options={"revision_interval": 1},
+    )
+
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = entry.runtime_data
+
+    plan["items"][0]["name"] = "Revised plan"
+    plan["items"][0]["revisions"].append(1999999999)
+    mock_aioclient.clear_requests()
+    mock_aioclient.get(re.compile(TEST_PATTERN), status=200, text=json.dumps(plan))
+    freezer.tick(timedelta(hours=1))
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert coordinator.metadata.data.rate_name == "Revised plan"
+    entity_id = er.async_get(hass).async_get_entity_id(
+        SENSOR_DOMAIN, DOMAIN, f"rate_name_{entry.entry_id}"
+    )
+    assert hass.states.get(entity_id).state == "Revised plan"
+
+
+async def test_update_metadata_entity(hass, mock_api):
+    """Test updating a plan metadata entity keeps it available."""
+    assert await async_setup_component(hass, "homeassistant", {})
+    entry = MockConfigEntry(domain=DOMAIN, title="Fake Utility Co", data=CONFIG_DATA)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    registry = er.async_get(hass)
+    entity_ids = [
+        registry.async_get_entity_id(
+            SENSOR_DOMAIN, DOMAIN, f"rate_name_{entry.entry_id}"
+        ),
+        registry.async_get_entity_id(
+            BINARY_SENSOR_DOMAIN, DOMAIN, f"approval_{entry.entry_id}"
+        ),
+    ]
+    states = [hass.states.get(entity_id).state for entity_id in entity_ids]
+
+    await hass.services.async_call(
+        "homeassistant", "update_entity", {"entity_id": entity_ids}, blocking=True
+    )
+    await hass.async_block_till_done()
+
+    assert entry.runtime_data.metadata.last_update_success
+    assert [hass.states.get(entity_id).state for entity_id in entity_ids] == states
@@ -0,0 +1,74 @@
+"""Tests for the shared plan store."""
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.openei.const import DOMAIN, STORAGE_KEY, STORAGE_SAVE_DELAY
+from custom_components.openei.plan_store import async_get_plan_store
+from tests.const import CONFIG_DATA
+
+pytestmark = pytest.mark.asyncio
+
+KEY = ("fakeAPIKey", "manualfakerateplan")
+
+
+async def test_concurrent_fetches_coalesce(hass, mock_api, mock_aioclient):
+    """Test concurrent fetches for one plan make a single request."""
+    store = async_get_plan_store(hass)
+    received = []
+    unsub = store.async_subscribe(KEY, received.append)
+
+    results = await asyncio.gather(*(store.async_fetch(KEY) for _ in range(5)))
+
+    assert mock_aioclient.call_count == 1
+    assert all(result is results[0] for result in results)
+    assert received == [results[0]]
+    assert store.async_get(KEY) is results[0]
+
+    unsub()
+    assert store.async_get(KEY) is None
+
+
+async def test_entries_share_plan(hass, mock_api, mock_aioclient):
+    """Test entries for the same plan and API key fetch it once."""
+    entries = [
+        MockConfigEntry(domain=DOMAIN, title=f"Meter {idx}", data=CONFIG_DATA)
+        for idx in range(3)
+    ]
+    for entry in entries:
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert mock_aioclient.call_count == 1
+    schedules = {id(entry.runtime_data._schedule) for entry in entries}
+    assert len(schedules) == 1
+
+    for entry in entries:
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    assert async_get_plan_store(hass).async_get(KEY) is None
+
+
+async def test_save_uses_snapshot(
+    hass, mock_api, mock_aioclient, hass_storage, freezer
+):
+    """Test a pending save writes the plans as they were when it was scheduled."""
+    store = async_get_plan_store(hass)
+    await store.async_fetch(KEY)
+
+    # Changes after scheduling are not seen by the write in the executor
+    stored = await store._async_load()
+    stored["otherplan"] = {"fetched": dt_util.utcnow().isoformat(), "plan": {}}
+
+    freezer.tick(timedelta(seconds=STORAGE_SAVE_DELAY))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    assert list(hass_storage[STORAGE_KEY]["data"]["plans"]) == ["manualfakerateplan"]
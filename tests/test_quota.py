@@ -0,0 +1,82 @@
+"""Tests for the API request budget."""
+
+import re
+from datetime import timedelta
+from unittest.mock import patch
+
+import openeihttp
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.openei.const import DOMAIN
+from custom_components.openei.quota import ApiQuota, QuotaExceeded, async_get_quota
+from tests.const import CONFIG_DATA
+
+pytestmark = pytest.mark.asyncio
+TEST_PATTERN = r"^https://api\.openei\.org/utility_rates\?.*$"
+
+
+async def _request(quota, error=None):
+    """Make a request against the budget, optionally failing it."""
+    async with quota.async_request():
+        if error is not None:
+            raise error
+
+
+async def test_bucket_refills(freezer):
+    """Test the budget is used up and refills over the hour."""
+    quota = ApiQuota(capacity=2)
+    await _request(quota)
+    await _request(quota)
+    assert quota.remaining == 0
+
+    with pytest.raises(QuotaExceeded):
+        await _request(quota)
+
+    freezer.tick(timedelta(minutes=30))
+    assert quota.remaining == 1
+    freezer.tick(timedelta(hours=2))
+    assert quota.remaining == 2
+
+
+async def test_backoff_after_rate_limit(freezer):
+    """Test rate limits back off exponentially with jitter."""
+    quota = ApiQuota()
+    with patch("custom_components.openei.quota.random.uniform", max):
+        with pytest.raises(openeihttp.RateLimit):
+            await _request(quota, openeihttp.RateLimit())
+        assert quota.remaining == 0
+        assert quota.backoff_until is not None
+
+        with pytest.raises(QuotaExceeded):
+            await _request(quota)
+
+        freezer.tick(timedelta(minutes=1, seconds=1))
+        with pytest.raises(openeihttp.RateLimit):
+            await _request(quota, openeihttp.RateLimit())
+
+        # The second backoff is twice as long
+        freezer.tick(timedelta(minutes=1, seconds=1))
+        with pytest.raises(QuotaExceeded):
+            await _request(quota)
+        freezer.tick(timedelta(minutes=1))
+        await _request(quota)
+        assert quota.backoff_until is None
+
+
+async def test_rate_limited_key_stops_requests(hass, mock_aioclient, freezer):
+    """Test entries sharing a rate limited key stop calling the API."""
+    mock_aioclient.get(
+        re.compile(TEST_PATTERN),
+        status=429,
+        json={"error": {"message": "You have exceeded your rate limit."}},
+    )
+    entry = MockConfigEntry(domain=DOMAIN, title="Fake Utility Co", data=CONFIG_DATA)
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert mock_aioclient.call_count == 1
+
+    await entry.runtime_data.async_refresh()
+    assert mock_aioclient.call_count == 1
+    assert async_get_quota(hass, "fakeAPIKey").backoff_until is not None
@@ -0,0 +1,169 @@
+"""Tests for the compiled rate schedule."""
+
+import json
+from datetime import UTC, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import openeihttp
+import pytest
+
+from custom_components.openei.schedule import RateSchedule
+from tests.common import load_fixture
+
+PLAN = json.loads(load_fixture("plan_data.json"))["items"][0]
+
+TIERED_PLAN = {
+    **PLAN,
+    "energyratestructure": [
+        [
+            {"max": 10, "rate": 0.1, "adj": 0.01},
+            {"max": 20, "rate": 0.2, "adj": 0.02},
+            {"rate": 0.3, "adj": 0.03, "sell": 0.05},
+        ],
+        [{"max": 20, "rate": 0.4}, {"max": 10, "rate": 0.45}, {"rate": 0.5}],
+        [{"max": 5, "rate": 0.6}, {"rate": 0.7, "adj": 0.07}],
+        [{"rate": 0.8, "sell": 0.04}],
+    ],
+}
+
+DATES = [
+    datetime(2024, 1, 1, 0),
+    datetime(2024, 3, 15, 11),
+    datetime(2024, 5, 4, 12),
+    datetime(2024, 6, 3, 15),
+    datetime(2024, 7, 6, 19),
+    datetime(2024, 9, 30, 23),
+    datetime(2024, 12, 31, 12),
+]
+
+
+def _library(plan, reading=0.0):
+    """Return the openeihttp implementation loaded with a plan."""
+    rates = openeihttp.Rates(api="fakeAPIKey", reading=reading)
+    rates._data = plan  # pylint: disable=protected-access
+    return rates
+
+
+@pytest.mark.parametrize("plan", [PLAN, TIERED_PLAN])
+@pytest.mark.parametrize("reading", [0.0, 4.0, 15.0, 25.0, 300.0, 1000.0])
+def test_schedule_matches_library(plan, reading):
+    """Test the compiled schedule agrees with the library."""
+    schedule = RateSchedule(plan)
+    rates = _library(plan, reading)
+
+    for when in DATES:
+        assert schedule.period(when) == rates.rate_structure(when, "energy")
+        assert schedule.rate(when, reading) == rates.rate(when)
+        assert schedule.adjustment(when, reading) == rates.adjustment(when)
+        assert schedule.tier_rate(when, reading) == rates.tier_rate_for_month(when)
+        assert schedule.sell_rate(when) == rates.sell_rate(when)
+
+    assert schedule.all_rates == rates.all_rates
+    assert schedule.rate_name == rates.rate_name
+    assert schedule.approval == rates.approval
+    assert schedule.distributed_generation == rates.distributed_generation
+    assert schedule.mincharge == rates.mincharge
+    assert schedule.fixedchargefirstmeter == rates.fixedchargefirstmeter
+
+
+@pytest.mark.parametrize("start", DATES)
+def test_next_change(start):
+    """Test the next change matches an hour by hour search."""
+    schedule = RateSchedule(PLAN)
+    current = schedule.period(start)
+
+    expected = start + timedelta(hours=1)
+    while schedule.period(expected) == current:
+        expected += timedelta(hours=1)
+
+    assert schedule.next_change(start) == (expected, schedule.period(expected))
+
+
+def test_next_change_flat_plan():
+    """Test a plan that never changes structure."""
+    plan = {
+        **PLAN,
+        "energyweekdayschedule": [[0] * 24] * 12,
+        "energyweekendschedule": [[0] * 24] * 12,
+    }
+    schedule = RateSchedule(plan)
+
+    assert schedule.next_change(datetime(2024, 6, 1, 12)) == (None, 0)
+
+
+def test_no_energy_structure():
+    """Test a plan without an energy rate structure."""
+    plan = {"name": "Demand only", "approved": False}
+    schedule = RateSchedule(plan)
+    when = datetime(2024, 6, 1, 12)
+
+    assert schedule.period(when) is None
+    assert schedule.rate(when) is None
+    assert schedule.adjustment(when) is None
+    assert schedule.tier_rate(when, 10.0) is None
+    assert schedule.sell_rate(when) is None
+    assert schedule.next_change(when) == (None, None)
+    assert schedule.all_rates is None
+    assert schedule.mincharge is None
+    assert schedule.fixedchargefirstmeter is None
+
+
+def test_hourly_prices():
+    """Test the year ahead price vectors follow the schedule."""
+    schedule = RateSchedule(PLAN)
+    rates, adjustments = schedule.hourly_prices(2024)
+
+    assert len(rates) == len(adjustments) == 366 * 24
+    assert schedule.hourly_prices(2024)[0] is rates
+    for when in DATES:
+        index = (when.timetuple().tm_yday - 1) * 24 + when.hour
+        assert rates[index] == schedule.rate(when)
+        assert adjustments[index] == schedule.adjustment(when)
+
+
+def test_cheapest_window():
+    """Test the sliding window matches a brute force search."""
+    schedule = RateSchedule(TIERED_PLAN)
+    start = datetime(2024, 4, 30, 5)
+
+    rates, adjustments = schedule.price_slice(start, 72)
+    prices = [rate + adj for rate, adj in zip(rates, adjustments, strict=True)]
+    for duration in (1, 3, 8):
+        sums = [sum(prices[i : i + duration]) for i in range(72 - duration + 1)]
+        offset = min(range(len(sums)), key=lambda i: (round(sums[i], 9), i))
+
+        window = schedule.cheapest_window(start, 72, duration)
+        assert window[0] == start + timedelta(hours=offset)
+        assert window[1] == pytest.approx(sums[offset] / duration)
+        assert schedule.cheapest_window(start, 72, duration) is window
+
+    assert schedule.cheapest_window(start, 2, 3) is None
+
+
+@pytest.mark.parametrize(
+    ("start", "hours"),
+    [
+        # 02:00 does not exist on spring forward day
+        ("2024-03-10 00:00", [0, 1, 3, 4]),
+        # 01:00 happens twice on fall back day
+        ("2024-11-03 00:00", [0, 1, 1, 2]),
+    ],
+)
+def test_forecast_daylight_saving(start, hours):
+    """Test the forecast steps through real hours across DST changes."""
+    schedule = RateSchedule(TIERED_PLAN)
+    start = datetime.fromisoformat(start).replace(
+        tzinfo=ZoneInfo("America/Los_Angeles")
+    )
+
+    forecast = schedule.forecast(start, 4)
+
+    assert [hour_start.hour for hour_start, _, _ in forecast] == hours
+    utc = [hour_start.astimezone(UTC) for hour_start, _, _ in forecast]
+    assert utc == [utc[0] + timedelta(hours=offset) for offset in range(4)]
+    for hour_start, rate, adjustment in forecast:
+        assert rate == schedule.rate(hour_start)
+        assert adjustment == (schedule.adjustment(hour_start) or 0.0)
+
+    window_start, _ = schedule.cheapest_window(start, 4, 1)
+    assert window_start in [hour_start for hour_start, _, _ in forecast]
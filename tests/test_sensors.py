@@ -3,6 +3,8 @@
 import logging
 
 import pytest
+from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
+from homeassistant.helpers import entity_registry as er
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.openei.const import DOMAIN
@@ -66,3 +68,23 @@ async def test_sensors(hass, mock_api, caplog):
 
         state = hass.states.get(FAKE_CURRENT_SELL_RATE_SENSOR)
         assert state.state == "unknown"
+
+
+async def test_all_rates_not_recorded(hass, mock_api):
+    """Test the rate tables are excluded from the recorder."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Fake Utility Co",
+        data=CONFIG_DATA,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = er.async_get(hass).async_get_entity_id(
+        SENSOR_DOMAIN, DOMAIN, f"current_rate_{entry.entry_id}"
+    )
+    state = hass.states.get(entity_id)
+    assert "all_rates" in state.attributes
+    assert "all_adjustments" in state.attributes
+    assert {"all_rates", "all_adjustments"} <= state.state_info["unrecorded_attributes"]
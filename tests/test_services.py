@@ -0,0 +1,237 @@
+"""Tests for OpenEI services."""
+
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import Context
+from homeassistant.exceptions import ServiceValidationError, Unauthorized
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.openei.const import DOMAIN
+from custom_components.openei.plan_store import async_get_plan_store
+from custom_components.openei.profiler import PHASES
+from tests.const import CONFIG_DATA
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _setup_entry(hass, options=None):
+    """Set up an OpenEI entry."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Fake Utility Co",
+        data=CONFIG_DATA,
+        options=options or {},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+async def test_get_price_forecast(hass, mock_api, freezer):
+    """Test the hourly price forecast."""
+    freezer.move_to("2024-12-31 20:15:00-07:00")
+    await hass.config.async_set_time_zone("America/Phoenix")
+    entry = await _setup_entry(hass)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "get_price_forecast",
+        {"config_entry_id": entry.entry_id, "hours": 6},
+        blocking=True,
+        return_response=True,
+    )
+
+    forecast = response["forecast"]
+    assert [hour["start"] for hour in forecast] == [
+        "2024-12-31T20:00:00-07:00",
+        "2024-12-31T21:00:00-07:00",
+        "2024-12-31T22:00:00-07:00",
+        "2024-12-31T23:00:00-07:00",
+        "2025-01-01T00:00:00-07:00",
+        "2025-01-01T01:00:00-07:00",
+    ]
+    assert forecast[0]["rate"] == entry.runtime_data.data.current_rate
+    assert forecast[0]["adjustment"] == entry.runtime_data.data.current_adjustment
+
+
+async def test_service_entry_not_loaded(hass, mock_api):
+    """Test services reject entries that are not loaded."""
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            "get_price_forecast",
+            {"config_entry_id": "missing"},
+            blocking=True,
+            return_response=True,
+        )
+
+
+async def test_find_cheapest_window(hass, mock_api, freezer):
+    """Test finding the cheapest window before a deadline."""
+    freezer.move_to("2024-06-03 08:20:00-07:00")
+    await hass.config.async_set_time_zone("America/Phoenix")
+    entry = await _setup_entry(hass)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "find_cheapest_window",
+        {
+            "config_entry_id": entry.entry_id,
+            "duration": 3,
+            "deadline": "2024-06-03 21:00:00",
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    # June weekdays are off-peak until noon and again from 7pm
+    assert response == {
+        "start": "2024-06-03T09:00:00-07:00",
+        "end": "2024-06-03T12:00:00-07:00",
+        "average_price": pytest.approx(0.06118 + 0.02138383),
+    }
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            "find_cheapest_window",
+            {
+                "config_entry_id": entry.entry_id,
+                "duration": 3,
+                "deadline": "2024-06-03 10:00:00",
+            },
+            blocking=True,
+            return_response=True,
+        )
+
+
+async def test_find_cheapest_window_span(hass, mock_api, freezer):
+    """Test the search span starts no earlier than now and is bounded."""
+    freezer.move_to("2024-06-03 08:20:00-07:00")
+    await hass.config.async_set_time_zone("America/Phoenix")
+    entry = await _setup_entry(hass)
+
+    # A start in the past is moved up to now
+    response = await hass.services.async_call(
+        DOMAIN,
+        "find_cheapest_window",
+        {
+            "config_entry_id": entry.entry_id,
+            "duration": 3,
+            "earliest_start": "2024-06-01 00:00:00",
+            "deadline": "2024-06-03 21:00:00",
+        },
+        blocking=True,
+        return_response=True,
+    )
+    assert response["start"] == "2024-06-03T09:00:00-07:00"
+
+    for data in (
+        {"deadline": "2024-06-03 08:00:00"},
+        {"earliest_start": "2024-06-04 10:00:00", "deadline": "2024-06-04 09:00:00"},
+        {"deadline": "2025-06-05 09:00:00"},
+    ):
+        with pytest.raises(ServiceValidationError):
+            await hass.services.async_call(
+                DOMAIN,
+                "find_cheapest_window",
+                {"config_entry_id": entry.entry_id, "duration": 3, **data},
+                blocking=True,
+                return_response=True,
+            )
+
+
+async def test_profile_refreshes(hass, mock_api, freezer, tmp_path):
+    """Test profiling a number of refreshes writes a profile file."""
+    hass.config.config_dir = str(tmp_path)
+    entry = await _setup_entry(hass, {"revision_interval": 1})
+    coordinator = entry.runtime_data
+    store = async_get_plan_store(hass)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "profile_refreshes",
+        {"config_entry_id": entry.entry_id, "refreshes": 2},
+        blocking=True,
+        return_response=True,
+    )
+    assert response["file"].startswith(str(tmp_path))
+    assert coordinator.profiling
+
+    # The first refresh downloads the plan again, the second uses the held one
+    freezer.tick(timedelta(hours=1))
+    await coordinator.async_refresh()
+    assert store.async_fetch_stats(coordinator.plan_key).decode_time is not None
+    assert coordinator.profiling
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert not coordinator.profiling
+    with open(response["file"], encoding="utf-8") as file:
+        profile = json.load(file)
+    assert profile["refreshes"] == 2
+    assert profile["estimated_phases"] == ["network", "json_decode"]
+    assert set(profile["summary"]) == {*PHASES, "total"}
+    for sample in profile["samples"]:
+        assert set(sample) == {"start", *PHASES, "total"}
+
+    # Nothing is timed once profiling is over
+    freezer.tick(timedelta(hours=1))
+    await coordinator.async_refresh()
+    assert store.async_fetch_stats(coordinator.plan_key).decode_time is None
+
+
+async def test_profile_refreshes_duration(
+    hass, mock_api, freezer, tmp_path, hass_read_only_user
+):
+    """Test profiling for a time window and who may start a profile."""
+    hass.config.config_dir = str(tmp_path)
+    # Keep the entry's hourly refresh at :30, out of the profiled window
+    freezer.move_to("2024-06-03 10:00:00+00:00")
+    with patch("custom_components.openei.entry_offset", return_value=1800):
+        entry = await _setup_entry(hass)
+    coordinator = entry.runtime_data
+
+    with pytest.raises(Unauthorized):
+        await hass.services.async_call(
+            DOMAIN,
+            "profile_refreshes",
+            {"config_entry_id": entry.entry_id},
+            blocking=True,
+            context=Context(user_id=hass_read_only_user.id),
+        )
+    assert not coordinator.profiling
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "profile_refreshes",
+        {"config_entry_id": entry.entry_id, "duration": {"minutes": 5}},
+        blocking=True,
+        return_response=True,
+    )
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            "profile_refreshes",
+            {"config_entry_id": entry.entry_id},
+            blocking=True,
+        )
+
+    for _ in range(3):
+        await coordinator.async_refresh()
+    assert coordinator.profiling
+
+    freezer.tick(timedelta(minutes=5))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    assert not coordinator.profiling
+    with open(response["file"], encoding="utf-8") as file:
+        assert json.load(file)["refreshes"] == 3